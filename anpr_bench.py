@@ -0,0 +1,358 @@
+"""Benchmarks of ANPR Detection Validator Pro's hot paths - headless
+
+Generates synthetic detection files (10k to 10M rows) and image folders, then
+times the code behind the GUI without a display:
+
+- time to first record: ValidationEngine.open, image folder index and the
+  first fit-to-canvas image (load_csv, validate_image_path, load_image)
+- navigation: next record with the prefetch window until both images are
+  fitted (next_record, load_image, display_image_normal), prefetched and cold
+- save: one verdict (add_validated_record) and a full compaction
+  (Save Validation Results)
+- zoom: in-place wheel ticks and drags on a ZoomViewport (zoom_to_area_in_place,
+  on_mouse_wheel, on_image_drag) and zoom popup renders (popup_zoom_fast)
+
+Tk's PhotoImage conversion is not included. Every scenario runs in a process
+of its own, so its peak RSS is its own. Results are written as JSON:
+
+    python anpr_bench.py --output bench.json
+    python anpr_bench.py --rows 10000 1000000 10000000 --layout flat huge --output bench.json
+"""
+import pandas as pd
+import numpy as np
+from PIL import Image, ImageDraw
+import os
+import sys
+import json
+import time
+import glob
+import shutil
+import argparse
+import platform
+import resource
+import subprocess
+import tempfile
+import PIL
+
+from anpr_core import (ImageCache, ImageIndexCache, ImagePrefetcher, ValidationEngine, ZoomViewport, POPUP_CROP_SIZE,
+                       render_viewport)
+
+# Canvas sizes of the default 1400x900 window - fit target and zoom viewport
+FIT_SIZE = (640, 520)
+VIEW_SIZE = (660, 540)
+
+# Distinct images per folder - the others are hard links to them
+BASE_IMAGES = 8
+
+
+def parse_resolution(text):
+    """'1920x1080' -> (1920, 1080)"""
+    width, height = (int(part) for part in text.lower().split('x'))
+    return width, height
+
+
+def make_image(resolution, seed):
+    """Synthetic camera frame: gradient background, noise and a light plate rectangle"""
+    width, height = resolution
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    gray = (x * 0.5 + y * 0.3 + rng.normal(0, 12, (height, width))).clip(0, 255).astype(np.uint8)
+    image = Image.fromarray(gray).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    left, top = int(width * 0.4), int(height * 0.65)
+    draw.rectangle((left, top, left + width // 8, top + height // 16), fill=(235, 235, 235), outline=(0, 0, 0))
+    return image
+
+
+def make_images(folder, count, resolution):
+    """Folder of count JPEGs (BASE_IMAGES distinct, the rest hard-linked) - reused if complete"""
+    names = [f"img{i:07d}.jpg" for i in range(count)]
+    if os.path.isdir(folder) and len(os.listdir(folder)) == count:
+        return names
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    bases = []
+    for i in range(min(count, BASE_IMAGES)):
+        path = os.path.join(folder, names[i])
+        make_image(resolution, i).save(path, quality=90)
+        bases.append(path)
+    for i in range(len(bases), count):
+        target = os.path.join(folder, names[i])
+        try:
+            os.link(bases[i % len(bases)], target)
+        except OSError:  # No hard links on this file system
+            shutil.copyfile(bases[i % len(bases)], target)
+    return names
+
+
+def make_detections(path, rows, images, resolution, chunk_rows=1_000_000):
+    """Detection CSV with rows records whose mediaids cycle through images - reused if present"""
+    if os.path.exists(path):
+        return
+    width, height = resolution
+    letters = np.array(list('ABCDEFGHJKLMNPRSTUVWXYZ'))
+    stems = np.array([os.path.splitext(name)[0] for name in images], dtype=object)
+    tmp_path = path + '.tmp'
+    for start in range(0, rows, chunk_rows):
+        rng = np.random.default_rng(start)
+        ids = np.arange(start, min(rows, start + chunk_rows))
+        count = len(ids)
+        plates = pd.Series(letters[rng.integers(0, len(letters), count)]).str.cat(
+            [pd.Series(letters[rng.integers(0, len(letters), count)]),
+             pd.Series(rng.integers(100, 9999, count).astype(str))], sep='')
+        front = plates.where(rng.random(count) > 0.05, '')
+        rear = plates.where(rng.random(count) > 0.2, plates.str[::-1])
+        chunk = pd.DataFrame({
+            'vdata_id': ids,
+            'fr_anpr': front,
+            're_anpr': rear,
+            'fr_mediaid': stems[(2 * ids) % len(stems)],
+            're_mediaid': stems[(2 * ids + 1) % len(stems)],
+            'camera_id': np.char.add('cam', rng.integers(0, 10, count).astype(str)),
+            'fr_plate_x1': int(width * 0.4), 'fr_plate_y1': int(height * 0.65),
+            'fr_plate_x2': int(width * 0.4) + width // 8, 'fr_plate_y2': int(height * 0.65) + height // 16,
+        })
+        chunk.to_csv(tmp_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    os.replace(tmp_path, path)
+
+
+def summarize(samples):
+    """count / mean / p50 / p95 / max of millisecond samples"""
+    if not samples:
+        return None
+    values = np.asarray(samples, dtype=float)
+    return {'count': len(values), 'mean': round(float(values.mean()), 3),
+            'p50': round(float(np.percentile(values, 50)), 3), 'p95': round(float(np.percentile(values, 95)), 3),
+            'max': round(float(values.max()), 3)}
+
+
+def elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def record_paths(engine, index):
+    """Resolved front / rear image paths of a record"""
+    return [engine.resolve_image_path(engine.df[column].iat[index]) for column in ('fr_mediaid', 're_mediaid')]
+
+
+def run_scenario(config):
+    """Time one detection file + image folder; returns the metrics dict"""
+    detections, folder = config['detections'], config['images']
+    records, think = config['records'], config['think_ms'] / 1000
+    for path in glob.glob(os.path.splitext(detections)[0] + '_VALIDATED*'):
+        os.remove(path)  # Start every run from an empty validation
+    index_cache = ImageIndexCache.default_cache_path(os.path.abspath(folder))
+    if os.path.exists(index_cache):
+        os.remove(index_cache)
+    
+    metrics = {}
+    cache = ImageCache(config['cache_mb'] * 1024 * 1024)
+    prefetcher = ImagePrefetcher(cache, config['workers'])
+    engine = ValidationEngine()
+    
+    # Time to first record - what the reviewer waits for after picking the files
+    start = time.perf_counter()
+    engine.open(detections)
+    metrics['open_ms'] = round(elapsed_ms(start), 3)
+    index_start = time.perf_counter()
+    engine.set_image_folder(folder)
+    metrics['index_cold_ms'] = round(elapsed_ms(index_start), 3)
+    first = prefetcher.submit(record_paths(engine, 0)[0], FIT_SIZE)
+    first.result()
+    cache.fit(record_paths(engine, 0)[0], FIT_SIZE)
+    metrics['time_to_first_record_ms'] = round(elapsed_ms(start), 3)
+    
+    start = time.perf_counter()
+    engine.set_image_folder(folder)
+    metrics['index_warm_ms'] = round(elapsed_ms(start), 3)
+    
+    start = time.perf_counter()
+    engine.df = engine.load_records()
+    engine.resume()
+    metrics['load_all_ms'] = round(elapsed_ms(start), 3)
+    records = min(records, len(engine.df) - 1)
+    
+    # Navigation with the prefetch window (3 ahead, 1 behind) and a reviewer's think time
+    samples = []
+    index = 0
+    for _ in range(records):
+        time.sleep(think)
+        start = time.perf_counter()
+        index = engine.next_index(index, 1)
+        window = [i for i in (index, index + 1, index + 2, index + 3, index - 1) if 0 <= i < len(engine.df)]
+        prefetcher.prefetch([(path, FIT_SIZE) for i in window for path in record_paths(engine, i) if path])
+        for path in record_paths(engine, index):
+            prefetcher.submit(path, FIT_SIZE).result()
+            cache.fit(path, FIT_SIZE)
+        samples.append(elapsed_ms(start))
+    metrics['navigation_ms'] = summarize(samples)
+    
+    # Cold navigation - nothing prefetched or cached, decoded on the spot
+    samples = []
+    for index in range(records):
+        cold_cache = ImageCache(config['cache_mb'] * 1024 * 1024)
+        start = time.perf_counter()
+        for path in record_paths(engine, len(engine.df) - 1 - index):
+            cold_cache.fit(path, FIT_SIZE)
+        samples.append(elapsed_ms(start))
+    metrics['navigation_cold_ms'] = summarize(samples)
+    
+    # Verdict clicks and Save Validation Results
+    samples = []
+    for index in range(records):
+        for side, value in (('front', 'correct'), ('rear', 'blur')):
+            start = time.perf_counter()
+            engine.record_verdict(index, side, value)
+            samples.append(elapsed_ms(start))
+    metrics['save_ms'] = summarize(samples)
+    start = time.perf_counter()
+    engine.compact()
+    metrics['compact_ms'] = round(elapsed_ms(start), 3)
+    
+    # In-place zoom: full resolution decode, then wheel ticks, refines and drags
+    path = record_paths(engine, 0)[0]
+    start = time.perf_counter()
+    original = cache.original(path)
+    metrics['zoom_open_ms'] = round(elapsed_ms(start), 3)
+    fit_scale = min(FIT_SIZE[0] / original.width, FIT_SIZE[1] / original.height, 1.0)
+    viewport = ZoomViewport(original, 2.0, (original.width * 0.45, original.height * 0.68), min_zoom=fit_scale)
+    viewport.render(VIEW_SIZE)
+    ticks, refines, drags = [], [], []
+    for tick in range(config['zoom_ticks']):
+        start = time.perf_counter()
+        viewport.zoom_at(1.25 if (tick // 5) % 2 == 0 else 0.8, (VIEW_SIZE[0] / 2, VIEW_SIZE[1] / 2), VIEW_SIZE)
+        viewport.render(VIEW_SIZE, Image.Resampling.BILINEAR)
+        ticks.append(elapsed_ms(start))
+        if tick % 5 == 4:  # End of a wheel burst - the LANCZOS refine
+            start = time.perf_counter()
+            viewport.render(VIEW_SIZE)
+            refines.append(elapsed_ms(start))
+    for step in range(config['zoom_ticks']):
+        start = time.perf_counter()
+        viewport.pan(8 if (step // 20) % 2 == 0 else -8, 3)
+        if viewport.needs_render(VIEW_SIZE):
+            viewport.render(VIEW_SIZE, Image.Resampling.BILINEAR)
+        viewport.item_position(VIEW_SIZE)
+        drags.append(elapsed_ms(start))
+    metrics['zoom_tick_ms'] = summarize(ticks)
+    metrics['zoom_refine_ms'] = summarize(refines)
+    metrics['drag_ms'] = summarize(drags)
+    
+    # Zoom popup wheel ticks on a crop of the frame
+    center_x, center_y = original.width // 2, original.height // 2
+    half_crop = POPUP_CROP_SIZE // 2  # As cut by show_zoom_popup
+    crop = original.crop((max(0, center_x - half_crop), max(0, center_y - half_crop),
+                          min(original.width, center_x + half_crop), min(original.height, center_y + half_crop)))
+    zoom, center = 1.0, (crop.width / 2, crop.height / 2)
+    samples = []
+    for tick in range(config['zoom_ticks']):
+        zoom = max(0.3, min(8.0, zoom * (1.2 if (tick // 5) % 2 == 0 else 1 / 1.2)))
+        start = time.perf_counter()
+        _, _, center = render_viewport(crop, zoom, center, VIEW_SIZE, Image.Resampling.BILINEAR)
+        samples.append(elapsed_ms(start))
+    metrics['popup_zoom_ms'] = summarize(samples)
+    
+    engine.close()
+    prefetcher.shutdown()
+    metrics['records'] = len(engine.df)
+    metrics['peak_rss_mb'] = peak_rss_mb()
+    return metrics
+
+
+def run_in_process(config):
+    """run_scenario in a fresh interpreter, so peak RSS and caches are per scenario"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-scenario', json.dumps(config)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    """Versions and machine details stored with the results"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'pandas': pd.__version__, 'numpy': np.__version__, 'pillow': PIL.__version__}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ANPR Detection Validator Pro - hot path benchmarks")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000],
+                        help="detection file sizes (default: 10000 100000)")
+    parser.add_argument('--layout', choices=('flat', 'huge'), nargs='+', default=['flat'],
+                        help="image folders: flat (--images files) and / or huge (--huge-images files)")
+    parser.add_argument('--resolution', nargs='+', default=['1920x1080', '4000x3000'],
+                        help="image resolutions WxH (default: 1920x1080 4000x3000)")
+    parser.add_argument('--images', type=int, default=2000, help="images in a flat folder (default: 2000)")
+    parser.add_argument('--huge-images', type=int, default=200_000,
+                        help="images in a huge folder (default: 200000)")
+    parser.add_argument('--records', type=int, default=50, help="records navigated / validated (default: 50)")
+    parser.add_argument('--think-ms', type=float, default=100,
+                        help="pause between records, as a reviewer looks at them (default: 100)")
+    parser.add_argument('--zoom-ticks', type=int, default=50, help="zoom / drag events timed (default: 50)")
+    parser.add_argument('--workers', type=int, default=2, help="prefetch decoder threads (default: 2)")
+    parser.add_argument('--cache-mb', type=int, default=1024, help="image cache budget (default: 1024)")
+    parser.add_argument('--workdir', help="where synthetic data is generated and kept (default: a temp dir)")
+    parser.add_argument('--output', help="results JSON file - printed if omitted")
+    parser.add_argument('--run-scenario', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point - see parse_args"""
+    args = parse_args(argv)
+    if args.run_scenario:
+        print(json.dumps(run_scenario(json.loads(args.run_scenario))))
+        return 0
+    
+    workdir = args.workdir or tempfile.mkdtemp(prefix='anpr_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    for layout in args.layout:
+        for resolution_text in args.resolution:
+            resolution = parse_resolution(resolution_text)
+            count = args.images if layout == 'flat' else args.huge_images
+            folder = os.path.join(workdir, f"images_{layout}_{resolution_text}_{count}")
+            print(f"Preparing {count} images {resolution_text} ({layout})...", file=sys.stderr)
+            images = make_images(folder, count, resolution)
+            for rows in args.rows:
+                detections = os.path.join(workdir, f"detections_{rows}_{resolution_text}_{count}.csv")
+                print(f"Preparing {rows} records...", file=sys.stderr)
+                make_detections(detections, rows, images, resolution)
+                scenario = {'rows': rows, 'layout': layout, 'resolution': resolution_text, 'images': count}
+                config = {'detections': detections, 'images': folder, 'records': args.records,
+                          'think_ms': args.think_ms, 'zoom_ticks': args.zoom_ticks,
+                          'workers': args.workers, 'cache_mb': args.cache_mb}
+                print(f"Running {scenario}...", file=sys.stderr)
+                results.append({'scenario': scenario, 'metrics': run_in_process(config)})
+    
+    report = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'environment': environment(),
+              'settings': {'records': args.records, 'think_ms': args.think_ms, 'zoom_ticks': args.zoom_ticks,
+                           'workers': args.workers, 'cache_mb': args.cache_mb,
+                           'fit_size': FIT_SIZE, 'view_size': VIEW_SIZE},
+              'results': results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
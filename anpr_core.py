@@ -0,0 +1,2161 @@
+"""Core of ANPR Detection Validator Pro - everything that does not need a display
+
+Loading detection files, resolving image paths, recording verdicts, resuming
+and exporting validation results. ANPRValidator (anpr_validator.py) is a Tk
+front-end of ValidationEngine; scripts and servers can use it directly, or
+run this module from the command line.
+"""
+import pandas as pd
+import numpy as np
+from PIL import Image
+import os
+from pathlib import Path
+import json
+import re
+import sqlite3
+import hashlib
+from bisect import bisect_left
+from contextlib import closing, nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import OrderedDict
+import threading
+import argparse
+import sys
+import time
+import io
+import math
+import functools
+import multiprocessing
+
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+except ImportError:  # Optional - only needed for Parquet / Arrow files
+    pa = None
+
+# Image file extensions, in the order they are tried when matching a mediaid
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+# Resampling filters selectable for fit-to-canvas thumbnails
+RESAMPLE_FILTERS = {
+    'nearest': Image.Resampling.NEAREST,
+    'bilinear': Image.Resampling.BILINEAR,
+    'bicubic': Image.Resampling.BICUBIC,
+    'lanczos': Image.Resampling.LANCZOS,
+}
+
+
+def strip_nan_suffix(name):
+    """Remove the '.NaN' / '.nan' suffix some exports append to mediaids"""
+    return name.replace('.NaN', '').replace('.nan', '')
+
+
+def scan_folder_names(folder):
+    """List file names in a folder using os.scandir entry metadata (no per-file stat)"""
+    with os.scandir(folder) as entries:
+        return [entry.name for entry in entries if entry.is_file()]
+
+
+class ImageIndex:
+    """In-memory index of an image folder - built once, O(1) mediaid lookups"""
+    
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self.names = set()       # exact file names
+        self.stems = {}          # image name without extension (and without .NaN) -> image name
+        self.reversed_names = [] # sorted reversed names - "file ends with mediaid" lookups
+        self.image_count = 0
+    
+    @classmethod
+    def build(cls, folder):
+        """Scan the folder ONCE with os.scandir and index every file"""
+        return cls.from_names(folder, scan_folder_names(folder))
+    
+    @classmethod
+    def load(cls, folder):
+        """Load the index from its on-disk cache (see ImageIndexCache), scanning only if needed"""
+        try:
+            return ImageIndexCache(folder).load()
+        except (sqlite3.Error, OSError):
+            # Cache not writable/corrupt - fall back to a plain scan
+            return cls.build(folder)
+    
+    @classmethod
+    def from_names(cls, folder, names):
+        """Create an index from an already known list of file names"""
+        index = cls(folder)
+        index.add_names(names)
+        return index
+    
+    def add_names(self, names):
+        """Add file names to the index"""
+        names = [name for name in names if name not in self.names]
+        for name in names:
+            self.names.add(name)
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in IMAGE_EXTENSIONS:
+                continue  # Sidecar files (.xml, .json, ...) must never win a stem match
+            self.image_count += 1
+            self.stems.setdefault(stem, name)
+            self.stems.setdefault(strip_nan_suffix(stem), name)
+        
+        self.reversed_names.extend(name[::-1] for name in names)
+        self.reversed_names.sort()
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def resolve(self, mediaid):
+        """Return the full path of the image for a CSV mediaid, or None"""
+        name = self.find_name(str(mediaid))
+        return os.path.join(self.folder, name) if name else None
+    
+    def find_name(self, mediaid):
+        """Match a mediaid to a file name - same rules as the old directory probing"""
+        base = strip_nan_suffix(mediaid)
+        
+        # Exact name, name + extension, .NaN-stripped name + extension
+        candidates = [mediaid] + [mediaid + ext for ext in IMAGE_EXTENSIONS]
+        candidates += [base + ext for ext in ('.jpg', '.jpeg', '.png')]
+        for candidate in candidates:
+            if candidate in self.names:
+                return candidate
+        
+        # Same stem with any other extension (e.g. upper case .JPG)
+        for stem in (mediaid, base):
+            if stem in self.stems:
+                return self.stems[stem]
+        
+        # Files that END with the mediaid, e.g. "<camera>_<mediaid>.jpg"
+        for suffix in (mediaid + '.jpg', mediaid):
+            name = self.find_suffix(suffix)
+            if name:
+                return name
+        return None
+    
+    def find_suffix(self, suffix):
+        """Binary search for any file name ending with suffix"""
+        if not suffix:
+            return None
+        key = suffix[::-1]
+        pos = bisect_left(self.reversed_names, key)
+        if pos < len(self.reversed_names) and self.reversed_names[pos].startswith(key):
+            return self.reversed_names[pos][::-1]
+        return None
+
+
+class ImageIndexCache:
+    """On-disk SQLite copy of an ImageIndex, reused across sessions
+    
+    The cache is keyed by the folder's mtime and entry count. When files were
+    only added it is refreshed incrementally, otherwise it is rebuilt.
+    """
+    
+    VERSION = '1'
+    
+    def __init__(self, folder, cache_path=None):
+        self.folder = os.path.abspath(folder)
+        self.cache_path = cache_path or self.default_cache_path(self.folder)
+    
+    @staticmethod
+    def default_cache_path(folder):
+        """'.<folder>.anpr_index.sqlite' next to the folder, or in ~/.anpr_validator if read-only"""
+        parent, name = os.path.split(folder.rstrip(os.sep))
+        if os.access(parent, os.W_OK):
+            return os.path.join(parent, f".{name}.anpr_index.sqlite")
+        digest = hashlib.sha1(folder.encode('utf-8')).hexdigest()[:16]
+        cache_dir = os.path.join(Path.home(), '.anpr_validator')
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, f"index_{digest}.sqlite")
+    
+    def connect(self):
+        conn = sqlite3.connect(self.cache_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY) WITHOUT ROWID")
+        return conn
+    
+    def load(self):
+        """Return an ImageIndex for the folder - from cache when it is still valid"""
+        dir_mtime = str(os.stat(self.folder).st_mtime_ns)
+        
+        with closing(self.connect()) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            cached = [row[0] for row in conn.execute("SELECT name FROM files")]
+            cache_valid = (meta.get('version') == self.VERSION and
+                           meta.get('folder') == self.folder and
+                           meta.get('entry_count') == str(len(cached)))
+            
+            # Folder unchanged since last session - no directory walk at all
+            if cache_valid and meta.get('dir_mtime') == dir_mtime:
+                return ImageIndex.from_names(self.folder, cached)
+            
+            names = scan_folder_names(self.folder)
+            new_names = set(names).difference(cached)
+            with conn:
+                if cache_valid and len(names) - len(new_names) == len(cached):
+                    # Only new files appeared - insert just those
+                    conn.executemany("INSERT OR IGNORE INTO files (name) VALUES (?)",
+                                     ((name,) for name in new_names))
+                else:
+                    conn.execute("DELETE FROM files")
+                    conn.executemany("INSERT INTO files (name) VALUES (?)", ((name,) for name in names))
+                index = ImageIndex.from_names(self.folder, names)
+                conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                    ('version', self.VERSION),
+                    ('folder', self.folder),
+                    ('dir_mtime', dir_mtime),
+                    ('entry_count', str(len(names))),
+                    ('image_count', str(index.image_count)),
+                ])
+            return index
+
+
+class LatencyHistogram:
+    """Durations (ms) in fixed log-spaced buckets - constant memory, no per-sample storage
+    
+    Four buckets per doubling from 0.01 ms to about 3 minutes, so percentiles
+    are within ~19% of the true value.
+    """
+    
+    BOUNDS = [0.01 * 2 ** (i / 4) for i in range(96)]
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, ms):
+        self.counts[bisect_left(self.BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+    
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (0-100)"""
+        if not self.count:
+            return None
+        wanted = q / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted and count:
+                return round(min(self.max, self.BOUNDS[bucket]) if bucket < len(self.BOUNDS) else self.max, 3)
+        return self.max
+    
+    def summary(self):
+        return {'count': self.count, 'mean': round(self.total / self.count, 3) if self.count else None,
+                'p50': self.percentile(50), 'p95': self.percentile(95), 'max': round(self.max, 3)}
+
+
+class Metrics:
+    """Opt-in hot path timings - one LatencyHistogram per name
+    
+    Disabled (the default), timer() returns a shared no-op context manager and
+    timed methods call straight through, so instrumented code costs next to
+    nothing. Safe to use from worker threads.
+    """
+    
+    NULL_TIMER = nullcontext()
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+    
+    def timer(self, name):
+        """with metrics.timer('image.decode'): ... - times the block"""
+        return MetricsTimer(self, name) if self.enabled else self.NULL_TIMER
+    
+    def record(self, name, ms):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(ms)
+    
+    def percentiles(self, name):
+        """(p50, p95) of name in ms, or None before its first sample"""
+        histogram = self.histograms.get(name)
+        if histogram is None or not histogram.count:
+            return None
+        return histogram.percentile(50), histogram.percentile(95)
+    
+    def summary(self):
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+    
+    def dump(self, path):
+        """Write the session's timings as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                       'ended': time.strftime('%Y-%m-%dT%H:%M:%S'), 'unit': 'ms',
+                       'metrics': self.summary()}, f, indent=2)
+
+
+class MetricsTimer:
+    """Context manager recording its block's duration - see Metrics.timer"""
+    
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def timed(name):
+    """Method decorator timing calls into self.metrics under name (when enabled)"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.metrics.enabled:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.metrics.record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorate
+
+
+class ImageCache:
+    """Thread-safe LRU cache of decoded images with a byte budget
+    
+    Holds full resolution originals and fit-to-canvas renditions, keyed by
+    (path, mtime, target_size) - target_size is None for originals. Shared by
+    the prefetcher, the normal view and the zoom views.
+    """
+    
+    def __init__(self, max_bytes=1024 * 1024 * 1024, metrics=None):
+        self.max_bytes = max_bytes
+        self.metrics = metrics or Metrics()
+        self.entries = OrderedDict()  # key -> (value, nbytes), least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def image_bytes(img):
+        return img.width * img.height * len(img.getbands())
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value, nbytes):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            # Evict least recently used entries, but never the one just added
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+    
+    def original(self, path, mtime=None):
+        """Full resolution decoded image"""
+        if mtime is None:
+            mtime = os.stat(path).st_mtime_ns
+        key = (path, mtime, None)
+        img = self.get(key)
+        if img is None:
+            with self.metrics.timer('image.decode_full'):
+                img = Image.open(path)
+                img.load()
+            self.put(key, img, self.image_bytes(img))
+        return img
+    
+    def fit(self, path, target_size, resample=Image.Resampling.LANCZOS):
+        """Decode an image scaled to fit target_size - safe to run off the Tk thread
+        
+        JPEGs are decoded in draft mode at the nearest 1/2, 1/4 or 1/8 scale and
+        other formats are reduced by an integer factor before the final resize,
+        so the full resolution original is only decoded when someone zooms.
+        Returns (fitted, scale, full_size) where scale maps original to fitted pixels.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, mtime, target_size, resample)
+        entry = self.get(key)
+        if entry is None:
+            img = Image.open(path)
+            full_size = img.size
+            target_width, target_height = target_size
+            scale = min(target_width / img.width, target_height / img.height)
+            new_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+            
+            original = self.get((path, mtime, None))
+            if original is not None:
+                img = original  # Already decoded for zooming - just scale it down
+            else:
+                with self.metrics.timer('image.decode'):
+                    if img.format == 'JPEG':
+                        img.draft(img.mode, new_size)
+                    img.load()
+                    factor = min(img.width // new_size[0], img.height // new_size[1])
+                    if factor >= 2:
+                        img = img.reduce(factor)
+            
+            with self.metrics.timer('image.resize'):
+                fitted = img.resize(new_size, resample)
+            entry = (fitted, scale, full_size)
+            self.put(key, entry, self.image_bytes(fitted))
+        return entry
+    
+    def plate(self, path, box=None, target_size=None, resample=Image.Resampling.LANCZOS):
+        """Plate region of an image - safe to run off the Tk thread
+        
+        box is the plate's (left, top, right, bottom) from the CSV, or None to
+        locate it with find_plate_region. Returns (crop, region) where crop is
+        the padded region at original resolution - or, with target_size,
+        already upscaled to fit it (see plate_zoom_factor).
+        """
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, mtime, 'plate', box, target_size, resample)
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        
+        if target_size is not None:
+            crop, region = self.plate(path, box, None, resample)
+            factor = plate_zoom_factor(crop.size, target_size)
+            new_size = (max(1, int(crop.width * factor)), max(1, int(crop.height * factor)))
+            entry = (crop.resize(new_size, resample), region)
+        else:
+            img = Image.open(path)
+            full_size = img.size
+            if box is not None:
+                box = clip_box(box, full_size)  # CSV boxes may lie (partly) outside the frame
+            if box is None:
+                if img.format == 'JPEG':
+                    img.draft('L', (full_size[0] // 8, full_size[1] // 8))
+                gray = img.convert('L')
+                gray.thumbnail((480, 480))
+                box = find_plate_region(gray, full_size)
+            region = pad_box(box, full_size)
+            
+            # Crop at full resolution; the decoded original is only kept if zooming cached it anyway
+            original = self.get((path, mtime, None))
+            if original is None:
+                original = Image.open(path)
+            entry = (original.crop(region), region)
+        self.put(key, entry, self.image_bytes(entry[0]))
+        return entry
+
+
+def find_plate_region(gray, full_size):
+    """Cheap guess of the licence plate box (left, top, right, bottom) in full_size pixels
+    
+    gray is a small greyscale copy of the image. Plate characters give the
+    densest patch of strong horizontal intensity changes, so the plate-shaped
+    window with the most of them (summed via an integral image) wins.
+    """
+    pixels = np.asarray(gray, dtype=np.int16)
+    edges = (np.abs(np.diff(pixels, axis=1)) > 40).astype(np.int32)
+    height, width = edges.shape
+    window_width, window_height = max(2, width // 6), max(2, height // 14)
+    if width <= window_width or height <= window_height:
+        return (0, 0) + tuple(full_size)
+    
+    integral = np.pad(edges.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    sums = (integral[window_height:, window_width:] - integral[:-window_height, window_width:]
+            - integral[window_height:, :-window_width] + integral[:-window_height, :-window_width])
+    top, left = np.unravel_index(np.argmax(sums), sums.shape)
+    
+    scale_x, scale_y = full_size[0] / gray.width, full_size[1] / gray.height
+    return (int(left * scale_x), int(top * scale_y),
+            int((left + window_width) * scale_x), int((top + window_height) * scale_y))
+
+
+def clip_box(box, full_size):
+    """A (left, top, right, bottom) box clipped to the image - None if no part of it is inside"""
+    left, top = max(0, box[0]), max(0, box[1])
+    right, bottom = min(full_size[0], box[2]), min(full_size[1], box[3])
+    return (left, top, right, bottom) if right > left and bottom > top else None
+
+
+def pad_box(box, full_size, margin=0.25):
+    """Grow a (left, top, right, bottom) box by margin of its size on every side, within the image"""
+    left, top, right, bottom = box
+    pad_x, pad_y = int((right - left) * margin), int((bottom - top) * margin)
+    return (max(0, left - pad_x), max(0, top - pad_y),
+            min(full_size[0], right + pad_x), min(full_size[1], bottom + pad_y))
+
+
+def plate_zoom_factor(crop_size, target_size, max_factor=4.0):
+    """Upscale factor that fits a plate crop into target_size (at most max_factor)"""
+    return min(target_size[0] / crop_size[0], target_size[1] / crop_size[1], max_factor)
+
+
+# Side of the original resolution area the zoom popup shows around the clicked point
+POPUP_CROP_SIZE = 300
+
+
+def render_viewport(image, zoom, center, viewport_size, resample=Image.Resampling.LANCZOS):
+    """Render just the part of image that a zoomed viewport shows
+    
+    zoom is viewport pixels per image pixel and center the image point shown
+    in the middle of the viewport (clamped to the image). Only the visible
+    source rectangle is resampled, so the cost depends on the viewport size,
+    not on the zoom level. Returns (rendered, (x, y)) - the viewport position
+    of rendered's top-left corner - and the clamped center.
+    """
+    viewport_width, viewport_height = viewport_size
+    center_x = min(max(center[0], 0.0), float(image.width))
+    center_y = min(max(center[1], 0.0), float(image.height))
+    view_left = center_x - viewport_width / (2 * zoom)
+    view_top = center_y - viewport_height / (2 * zoom)
+    
+    box = (max(0.0, view_left), max(0.0, view_top),
+           min(float(image.width), view_left + viewport_width / zoom),
+           min(float(image.height), view_top + viewport_height / zoom))
+    size = (max(1, round((box[2] - box[0]) * zoom)), max(1, round((box[3] - box[1]) * zoom)))
+    # Zoomed out, shrink by an integer factor first - much faster, near-identical for LANCZOS at gap 2
+    reducing_gap = None
+    if zoom < 1:
+        reducing_gap = 2.0 if resample == Image.Resampling.LANCZOS else 1.0
+    rendered = image.resize(size, resample, box=box, reducing_gap=reducing_gap)
+    offset = (round((box[0] - view_left) * zoom), round((box[1] - view_top) * zoom))
+    return rendered, offset, (center_x, center_y)
+
+
+class ZoomViewport:
+    """Pan / zoom state of a zoomed image view
+    
+    zoom is view pixels per image pixel and center the image point in the
+    middle of the view. render draws only the visible region plus a margin on
+    every side, so a drag can just move the last rendering until it would
+    uncover image that was not rendered (see needs_render).
+    """
+    
+    def __init__(self, image, zoom, center, margin=0.5, min_zoom=0.05, max_zoom=8.0):
+        self.image = image
+        self.margin = margin
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.zoom = min(max(zoom, min_zoom), max_zoom)
+        self.center = self.clamp(center)
+        self.rendered_box = None  # Image-space box of the last rendering
+        self.rendered_zoom = None
+        self.preview = False  # Last rendering used a fast filter
+    
+    def clamp(self, point):
+        return (min(max(point[0], 0.0), float(self.image.width)),
+                min(max(point[1], 0.0), float(self.image.height)))
+    
+    def to_image(self, view_point, view_size):
+        """Image coordinates of a point in the view"""
+        return (self.center[0] + (view_point[0] - view_size[0] / 2) / self.zoom,
+                self.center[1] + (view_point[1] - view_size[1] / 2) / self.zoom)
+    
+    def pan(self, delta_x, delta_y):
+        """Drag the image by (delta_x, delta_y) view pixels"""
+        self.center = self.clamp((self.center[0] - delta_x / self.zoom, self.center[1] - delta_y / self.zoom))
+    
+    def zoom_at(self, factor, view_point, view_size):
+        """Zoom by factor, keeping the image point under view_point where it is"""
+        anchor = self.to_image(view_point, view_size)
+        self.zoom = min(max(self.zoom * factor, self.min_zoom), self.max_zoom)
+        self.center = self.clamp((anchor[0] - (view_point[0] - view_size[0] / 2) / self.zoom,
+                                  anchor[1] - (view_point[1] - view_size[1] / 2) / self.zoom))
+    
+    def visible_box(self, view_size):
+        """Image-space box shown in the view, clipped to the image"""
+        half_width, half_height = view_size[0] / (2 * self.zoom), view_size[1] / (2 * self.zoom)
+        return (max(0.0, self.center[0] - half_width), max(0.0, self.center[1] - half_height),
+                min(float(self.image.width), self.center[0] + half_width),
+                min(float(self.image.height), self.center[1] + half_height))
+    
+    def needs_render(self, view_size):
+        """True when the last rendering does not cover the view any more"""
+        if self.rendered_box is None or self.rendered_zoom != self.zoom:
+            return True
+        left, top, right, bottom = self.visible_box(view_size)
+        rendered_left, rendered_top, rendered_right, rendered_bottom = self.rendered_box
+        # Half a pixel of slack for rounding in render_viewport
+        slack = 0.5 / self.zoom
+        return (left < rendered_left - slack or top < rendered_top - slack or
+                right > rendered_right + slack or bottom > rendered_bottom + slack)
+    
+    def render(self, view_size, resample=Image.Resampling.LANCZOS):
+        """Render the view plus margin; returns (rendered, view position of its top-left)"""
+        buffer_size = (int(view_size[0] * (1 + 2 * self.margin)), int(view_size[1] * (1 + 2 * self.margin)))
+        rendered, offset, self.center = render_viewport(self.image, self.zoom, self.center, buffer_size, resample)
+        
+        left = self.center[0] - buffer_size[0] / (2 * self.zoom) + offset[0] / self.zoom
+        top = self.center[1] - buffer_size[1] / (2 * self.zoom) + offset[1] / self.zoom
+        self.rendered_box = (left, top, left + rendered.width / self.zoom, top + rendered.height / self.zoom)
+        self.rendered_zoom = self.zoom
+        self.preview = resample != Image.Resampling.LANCZOS
+        return rendered, self.item_position(view_size)
+    
+    def item_position(self, view_size):
+        """Current view position of the last rendering's top-left corner"""
+        return (round((self.rendered_box[0] - self.center[0]) * self.zoom + view_size[0] / 2),
+                round((self.rendered_box[1] - self.center[1]) * self.zoom + view_size[1] / 2))
+
+
+class ImagePrefetcher:
+    """Decodes and pre-scales images of upcoming records on a worker thread pool
+    
+    Only used from the Tk thread. Decoded images land in the shared ImageCache,
+    ready for ImageTk.PhotoImage - a finished Future just means "cached".
+    """
+    
+    def __init__(self, cache, workers=2, resample=Image.Resampling.LANCZOS):
+        self.cache = cache
+        self.resample = resample
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='anpr-prefetch')
+        self.futures = {}  # (path, target_size) or ('plate', path, box, target_size) -> Future
+    
+    def decode(self, path, target_size):
+        """Worker job - the pixels live in the cache only, so its byte budget holds"""
+        self.cache.fit(path, target_size, self.resample)
+    
+    def crop_plate(self, path, box, target_size):
+        """Worker job for plate crops - see ImageCache.plate"""
+        self.cache.plate(path, box, target_size)
+    
+    def submit_plate(self, path, box, target_size):
+        """Return the Future for a plate crop, queueing it if it is not known yet"""
+        key = ('plate', path, box, target_size)
+        future = self.futures.get(key)
+        if future is None:
+            future = self.executor.submit(self.crop_plate, path, box, target_size)
+            self.futures[key] = future
+        return future
+    
+    def submit(self, path, target_size):
+        """Return the Future for an image, queueing it if it is not known yet"""
+        key = (path, target_size)
+        future = self.futures.get(key)
+        if future is None:
+            future = self.executor.submit(self.decode, path, target_size)
+            self.futures[key] = future
+        return future
+    
+    def prefetch(self, keys, plates=()):
+        """Make keys the prefetch window, in priority order
+        
+        keys are (path, target_size) images to fit; plates are (path, box,
+        target_size) plate crops, queued after all of them. Queued jobs are
+        cancelled and re-queued in the new order, so a jump to another record
+        never waits behind work for the old position. Running and finished jobs
+        inside the window are kept, everything else is dropped.
+        """
+        wanted = set(keys) | {('plate',) + plate for plate in plates}
+        for key, future in list(self.futures.items()):
+            if key not in wanted or not (future.running() or future.done()):
+                future.cancel()
+                del self.futures[key]
+        for path, target_size in keys:
+            self.submit(path, target_size)
+        for path, box, target_size in plates:
+            self.submit_plate(path, box, target_size)
+    
+    def shutdown(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        self.executor.shutdown(wait=False)
+
+
+# Columns every detection file must have - the only ones parsed up front
+REQUIRED_COLUMNS = ['vdata_id', 'fr_anpr', 're_anpr', 'fr_mediaid', 're_mediaid']
+TEXT_DTYPES = {column: str for column in REQUIRED_COLUMNS[1:]}  # vdata_id dtype is inferred
+
+# Optional plate bounding boxes per side, in original image pixels - read along with
+# the required columns when a file has them (see ValidationEngine.plate_box)
+PLATE_BOX_COLUMNS = {'front': ['fr_plate_x1', 'fr_plate_y1', 'fr_plate_x2', 'fr_plate_y2'],
+                     'rear': ['re_plate_x1', 're_plate_y1', 're_plate_x2', 're_plate_y2']}
+
+
+def browse_columns(columns):
+    """REQUIRED_COLUMNS plus the optional plate box columns present in columns"""
+    optional = [column for side_columns in PLATE_BOX_COLUMNS.values() for column in side_columns]
+    return REQUIRED_COLUMNS + [column for column in optional if column in columns]
+
+# Columnar detection / output formats (need pyarrow)
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+
+# Validation output formats -> file extension
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+
+# Records parsed synchronously by load_csv so the first one shows at once
+PREVIEW_ROWS = 1000
+
+# Output columns holding the front / rear verdicts
+VALIDATION_COLUMNS = ('fr_validation', 're_validation')
+
+# Verdict columns per image side
+SIDE_COLUMNS = {'front': 'fr_validation', 'rear': 're_validation'}
+
+
+class CsvDetectionSource:
+    """Lazy access to a (possibly multi-GB) detection CSV
+    
+    Only REQUIRED_COLUMNS (and plate boxes) are parsed for browsing. A byte-offset index of the
+    data rows lets every other column of a row be read on demand; large
+    selections are streamed chunk by chunk instead.
+    """
+    
+    CHUNK_BYTES = 64 * 1024 * 1024
+    CHUNK_ROWS = 500_000
+    
+    def __init__(self, path):
+        self.path = path
+        self.columns = list(pd.read_csv(path, nrows=0).columns)
+        self.offsets = None  # Byte offset of every data row, None until built (or unusable)
+    
+    def read_required(self, nrows=None, text_ids=False):
+        """The required columns only, with compact dtypes - vdata_id as written with text_ids"""
+        dtypes = {**TEXT_DTYPES, 'vdata_id': str} if text_ids else TEXT_DTYPES
+        return pd.read_csv(self.path, usecols=browse_columns(self.columns), dtype=dtypes, nrows=nrows)
+    
+    def load(self, text_ids=False):
+        """Read all records' required columns and index row offsets - run off the Tk thread"""
+        df = self.read_required(text_ids=text_ids)
+        self.build_offsets(len(df))
+        return df
+    
+    def build_offsets(self, row_count):
+        """Vectorised newline scan giving the start of every data row"""
+        starts = []
+        position = 0
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(self.CHUNK_BYTES)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                starts.append(newlines.astype(np.int64) + position + 1)
+                position += len(chunk)
+        offsets = np.concatenate(starts) if starts else np.zeros(0, dtype=np.int64)
+        offsets = offsets[offsets < position]  # No row starts after the final newline
+        
+        # Quoted newlines or blank lines make lines != records - fall back to streaming
+        self.offsets = offsets if len(offsets) == row_count else None
+    
+    def fetch_rows(self, rows):
+        """All columns of the given row positions, in that order"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return pd.DataFrame(columns=self.columns)
+        if self.offsets is None or len(rows) > len(self.offsets) // 20:
+            return self.stream_rows(rows)
+        
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            lines = []
+            for row in rows:
+                f.seek(self.offsets[row])
+                line = f.readline()
+                lines.append(line if line.endswith(b'\n') else line + b'\n')
+        return pd.read_csv(io.BytesIO(header + b''.join(lines)), dtype=TEXT_DTYPES)
+    
+    def stream_rows(self, rows):
+        """fetch_rows for many rows - one sequential pass over the file"""
+        order = np.argsort(rows, kind='stable')
+        sorted_rows = rows[order]
+        parts = []
+        start = 0
+        for chunk in pd.read_csv(self.path, dtype=TEXT_DTYPES, chunksize=self.CHUNK_ROWS):
+            stop = start + len(chunk)
+            low, high = np.searchsorted(sorted_rows, [start, stop])
+            if high > low:
+                parts.append(chunk.iloc[sorted_rows[low:high] - start])
+            start = stop
+            if high == len(sorted_rows):
+                break
+        frame = pd.concat(parts, ignore_index=True)
+        return frame.iloc[np.argsort(order, kind='stable')].reset_index(drop=True)
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet / Arrow files need pyarrow - install it with: pip install pyarrow")
+
+
+class ArrowDetectionSource:
+    """Parquet or Arrow IPC (Feather) detection file - memory-mapped, column-projected reads
+    
+    Same interface as CsvDetectionSource. Rows are fetched by position without
+    any offset index: only the Parquet row groups / IPC record batches holding
+    them are decoded. Feather files are LZ4-compressed by default, so columns
+    and batches that are not needed are never decompressed.
+    """
+    
+    def __init__(self, path):
+        require_pyarrow()
+        self.path = path
+        self.parquet = None
+        self.ipc = None
+        self.batch_sizes = None  # Rows per IPC record batch - see chunk_sizes
+        if os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS:
+            self.parquet = pq.ParquetFile(path, memory_map=True)
+            self.columns = list(self.parquet.schema_arrow.names)
+        else:
+            # Footer and schema only - record batches are read on demand
+            self.ipc = pa.ipc.open_file(pa.memory_map(path))
+            self.columns = list(self.ipc.schema.names)
+    
+    def open_projected(self, columns):
+        """IPC reader that decodes only the given columns (in file order)"""
+        options = pa.ipc.IpcReadOptions(included_fields=sorted(self.columns.index(column) for column in columns))
+        return pa.ipc.open_file(pa.memory_map(self.path), options=options)
+    
+    def read_required(self, nrows=None, text_ids=False):
+        """The required columns only - vdata_id as text with text_ids"""
+        columns = browse_columns(self.columns)
+        if self.ipc is not None:
+            reader = self.open_projected(columns)
+            batches, count = [], 0
+            for number in range(reader.num_record_batches):
+                if nrows is not None and count >= nrows:
+                    break
+                batch = reader.get_batch(number)
+                batches.append(batch)
+                count += batch.num_rows
+            table = pa.Table.from_batches(batches, schema=reader.schema).select(columns)
+            if nrows is not None:
+                table = table.slice(0, nrows)
+        elif nrows is None:
+            table = self.parquet.read(columns=columns)
+        else:
+            batch = next(self.parquet.iter_batches(batch_size=nrows, columns=columns), None)
+            if batch is None:
+                return pd.DataFrame(columns=columns)
+            table = pa.Table.from_batches([batch])
+        df = table.to_pandas()
+        if text_ids:
+            df['vdata_id'] = df['vdata_id'].astype(str)  # Typed column - the same text in every read
+        return df
+    
+    def load(self, text_ids=False):
+        return self.read_required(text_ids=text_ids)
+    
+    def chunk_sizes(self):
+        """Rows per Parquet row group / IPC record batch"""
+        if self.parquet is not None:
+            metadata = self.parquet.metadata
+            return [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+        if self.batch_sizes is None:
+            # Batch lengths need the batches - decode just the first column for them
+            reader = self.open_projected(self.columns[:1])
+            self.batch_sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+        return self.batch_sizes
+    
+    def read_chunks(self, chunks):
+        """All columns of the given row groups / record batches, concatenated"""
+        if self.parquet is not None:
+            return self.parquet.read_row_groups(chunks)
+        return pa.Table.from_batches([self.ipc.get_batch(chunk) for chunk in chunks], schema=self.ipc.schema)
+    
+    def fetch_rows(self, rows):
+        """All columns of the given row positions, in that order"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return pd.DataFrame(columns=self.columns)
+        
+        sizes = self.chunk_sizes()
+        bounds = np.cumsum([0] + sizes)
+        chunks = np.searchsorted(bounds, rows, side='right') - 1
+        needed = np.unique(chunks)
+        table = self.read_chunks(needed.tolist())
+        
+        # Position of each row inside the concatenation of the needed chunks
+        needed_starts = np.cumsum([0] + [sizes[chunk] for chunk in needed[:-1]])
+        local = rows - bounds[chunks] + needed_starts[np.searchsorted(needed, chunks)]
+        return table.take(pa.array(local)).to_pandas()
+
+
+# Ways to split a detection file between reviewers - see shard_of
+SHARD_METHODS = ('hash', 'range')
+
+
+def parse_shard(text):
+    """'k/n' (k-th of n shards, 1-based) -> (k - 1, n); raises ValueError"""
+    try:
+        number, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like k/n, e.g. 2/8 - got {text!r}") from None
+    if not 1 <= number <= count:
+        raise ValueError(f"Shard {text} is out of range - k must be between 1 and n")
+    return number - 1, count
+
+
+def shard_of(vdata_ids, shards, method='hash'):
+    """Shard (0 .. shards-1) of every vdata_id - the same for every reviewer
+    
+    'hash' spreads records evenly by a stable hash of the vdata_id text, so a
+    record keeps its shard whatever its position in the file. 'range' gives
+    each shard a contiguous range of sorted vdata_ids (numeric when they all are).
+    """
+    ids = vdata_ids.astype(str)  # Text form, as matched by ValidationStore.from_verdicts
+    if method == 'hash':
+        return (pd.util.hash_pandas_object(ids, index=False).to_numpy() % shards).astype(np.int64)
+    numeric = pd.to_numeric(vdata_ids, errors='coerce')
+    keys = (numeric if not numeric.isna().any() else ids).to_numpy()
+    uniques = np.unique(keys)
+    return np.searchsorted(uniques, keys) * shards // max(len(uniques), 1)
+
+
+class ShardSource:
+    """One reviewer's shard of a detection source - same interface, shard row positions
+    
+    load() keeps only the shard's records; fetch_rows maps shard positions back
+    to the underlying file. A hash shard is known row by row, so the preview
+    shows its first records; a range shard needs every vdata_id first, so its
+    preview is empty. vdata_ids are read as text: a dtype inferred from the
+    preview rows could differ from the full file's ('123' vs '123.0') and move
+    records to another shard.
+    """
+    
+    def __init__(self, source, shard, shards, method='hash'):
+        self.source = source
+        self.columns = source.columns
+        self.shard = shard
+        self.shards = shards
+        self.method = method
+        self.rows = None  # Source row position of every shard record, once loaded
+    
+    def read_required(self, nrows=None):
+        if nrows is None:
+            return self.load()
+        if self.method != 'hash':
+            return self.source.read_required(nrows=1, text_ids=True).iloc[:0]
+        # About nrows shard records from the first nrows * shards records
+        df = self.source.read_required(nrows=nrows * self.shards, text_ids=True)
+        return df[shard_of(df['vdata_id'], self.shards) == self.shard].reset_index(drop=True)
+    
+    def load(self):
+        df = self.source.load(text_ids=True)
+        keep = shard_of(df['vdata_id'], self.shards, self.method) == self.shard
+        self.rows = np.flatnonzero(keep)
+        return df[keep].reset_index(drop=True)
+    
+    def fetch_rows(self, rows):
+        return self.source.fetch_rows(self.rows[np.asarray(rows, dtype=np.int64)])
+
+
+# Columns a sample is stratified by when present, in order of preference
+STRATA_COLUMNS = ('camera_id', 'camera', 'site_id', 'site', 'location')
+
+# z for the 95% confidence intervals of sample sizes and accuracy reports
+CONFIDENCE_Z = 1.959964
+
+
+def sample_size_for_margin(margin, population, z=CONFIDENCE_Z):
+    """Records to review for an accuracy estimate within +/- margin (worst case p = 0.5)"""
+    size = z * z * 0.25 / (margin * margin)
+    size = size / (1 + (size - 1) / population) if population else 0  # Finite population
+    return min(population, math.ceil(size))
+
+
+def allocate_sample(size, population):
+    """Split size over strata in proportion to their population (largest remainders)"""
+    population = np.asarray(population, dtype=np.int64)
+    total = population.sum()
+    if not total:
+        return np.zeros(len(population), dtype=np.int64)
+    share = size * population / total
+    counts = np.floor(share).astype(np.int64)
+    remainder = size - counts.sum()
+    counts[np.argsort(counts - share, kind='stable')[:remainder]] += 1
+    return np.minimum(counts, population)
+
+
+class SampleSource:
+    """Stratified random sample of a detection source - same interface, sample row positions
+    
+    The strata are the values of strata_column (by default the first of
+    STRATA_COLUMNS in the file), or whether fr_anpr is present. The sample has
+    size records, or as many as an accuracy estimate within +/- margin needs,
+    allocated to strata in proportion to their size. It only depends on the
+    file and seed, so it is the same every time the file is opened. df gets a
+    sample_stratum column; population holds the record count of each stratum.
+    """
+    
+    def __init__(self, source, size=None, margin=None, strata_column=None, seed=0):
+        if (size is None) == (margin is None):
+            raise ValueError("Give either a sample size or a margin of error")
+        if strata_column is None:
+            strata_column = next((column for column in STRATA_COLUMNS if column in source.columns), None)
+        elif strata_column not in source.columns:
+            raise ValueError(f"Column {strata_column} is not in the file")
+        self.source = source
+        self.columns = source.columns
+        self.size = size
+        self.margin = margin
+        self.strata_column = strata_column
+        self.seed = seed
+        self.rows = None  # Source row position of every sampled record, once loaded
+        self.population = None  # Series: stratum -> records in the whole file
+    
+    def read_required(self, nrows=None, text_ids=False):
+        if nrows is None:
+            return self.load(text_ids)
+        return self.source.read_required(nrows=1, text_ids=text_ids).iloc[:0]  # Known once every record is read
+    
+    def strata(self, df):
+        """Stratum label of every record"""
+        if self.strata_column is None:
+            present = df['fr_anpr'].fillna('').astype(str).str.strip() != ''
+            return pd.Series(np.where(present, 'fr_anpr present', 'fr_anpr missing'), index=df.index)
+        if self.strata_column in df.columns:
+            return df[self.strata_column].fillna('').astype(str)
+        return read_table_columns(self.source.path, [self.strata_column])[self.strata_column]
+    
+    def load(self, text_ids=False):
+        df = self.source.load(text_ids=text_ids)
+        labels = self.strata(df).to_numpy()
+        codes, names = pd.factorize(labels)
+        population = np.bincount(codes, minlength=len(names))
+        size = self.size if self.margin is None else sample_size_for_margin(self.margin, len(df))
+        counts = allocate_sample(min(size, len(df)), population)
+        
+        # Random order within each stratum, then the first counts[stratum] of each
+        keys = np.random.default_rng(self.seed).random(len(df))
+        order = np.lexsort((keys, codes))
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+        rank = np.empty(len(df), dtype=np.int64)
+        rank[order] = np.arange(len(df)) - np.repeat(starts, population)
+        keep = rank < counts[codes]
+        
+        self.rows = np.flatnonzero(keep)
+        self.population = pd.Series(population, index=pd.Index(names, name='stratum'))
+        sample = df[keep].reset_index(drop=True)
+        sample['sample_stratum'] = pd.Categorical(labels[keep], categories=names)
+        return sample
+    
+    def fetch_rows(self, rows):
+        return self.source.fetch_rows(self.rows[np.asarray(rows, dtype=np.int64)])
+
+
+def parse_sample(text):
+    """'1000' (records) or '3%' (margin of error) -> SampleSource keyword arguments"""
+    try:
+        if text.endswith('%'):
+            margin = float(text[:-1]) / 100
+            if 0 < margin < 1:
+                return {'margin': margin}
+        elif int(text) > 0:
+            return {'size': int(text)}
+    except ValueError:
+        pass
+    raise ValueError(f"Sample must be a record count (1000) or a margin of error (3%) - got {text!r}")
+
+
+def sample_name(sample):
+    """File name part for a sample - one results file per distinct sample"""
+    name = f"sample{sample['size']}" if sample.get('size') else f"sample{sample['margin'] * 100:g}pct"
+    if sample.get('strata_column'):
+        name += f"-by-{sample['strata_column']}"
+    if sample.get('seed'):
+        name += f"-seed{sample['seed']}"
+    return name
+
+
+def add_sample_arguments(parser):
+    """--sample / --sample-by / --sample-seed, shared by the GUI and command line tools"""
+    parser.add_argument('--sample', metavar='N|M%',
+                        help="audit a stratified random sample: N records, or enough for +/- M%% accuracy")
+    parser.add_argument('--sample-by', metavar='COLUMN',
+                        help=f"column the sample is stratified by (default: first of {', '.join(STRATA_COLUMNS)}"
+                             f" present, else whether fr_anpr is present)")
+    parser.add_argument('--sample-seed', type=int, default=0, metavar='SEED',
+                        help="random seed of the sample (default: 0)")
+
+
+def sample_options(args):
+    """SampleSource keyword arguments from add_sample_arguments options, or None; raises ValueError"""
+    if not args.sample:
+        return None
+    sample = parse_sample(args.sample)
+    sample.update(strata_column=args.sample_by, seed=args.sample_seed)
+    return sample
+
+
+def open_detection_source(path):
+    """Detection file reader chosen by extension - CSV unless Parquet / Arrow"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PARQUET_EXTENSIONS or extension in ARROW_EXTENSIONS:
+        return ArrowDetectionSource(path)
+    return CsvDetectionSource(path)
+
+
+def read_table_columns(path, columns):
+    """Read selected columns of a CSV / Parquet / Feather file as text"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PARQUET_EXTENSIONS or extension in ARROW_EXTENSIONS:
+        require_pyarrow()
+        if extension in PARQUET_EXTENSIONS:
+            available = pq.read_schema(path).names
+        else:
+            available = pa.ipc.open_file(pa.memory_map(path)).schema.names  # Footer only
+        if not all(column in available for column in columns):
+            return None
+        if extension in PARQUET_EXTENSIONS:
+            table = pq.read_table(path, columns=columns, memory_map=True)
+        else:
+            table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas().fillna('').astype(str)
+    
+    header = pd.read_csv(path, nrows=0).columns
+    if not all(column in header for column in columns):
+        return None
+    return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)[columns]
+
+
+def read_table(path):
+    """Every column of a CSV / Parquet / Feather file, CSV values as text"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PARQUET_EXTENSIONS:
+        require_pyarrow()
+        return pq.read_table(path, memory_map=True).to_pandas()
+    if extension in ARROW_EXTENSIONS:
+        require_pyarrow()
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def write_table(frame, path, output_format):
+    """Write a DataFrame as csv, parquet or feather"""
+    if output_format == 'csv':
+        frame.to_csv(path, index=False)
+        return
+    require_pyarrow()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if output_format == 'parquet':
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path)
+
+
+def find_saved_output(output_path):
+    """The validation file saved last for output_path, in any output format
+    
+    After a switch of output format both files exist; the newer one holds
+    every verdict, the other is stale. output_path wins a tie.
+    """
+    base = os.path.splitext(output_path)[0]
+    paths = [output_path] + [base + extension for extension in OUTPUT_FORMATS.values()
+                             if base + extension != output_path]
+    saved = [path for path in paths if os.path.exists(path)]
+    if not saved:
+        return None
+    return max(saved, key=lambda path: os.stat(path).st_mtime_ns)
+
+
+def match_vdata_ids(source_ids, vdata_ids):
+    """Row position in source_ids of every vdata_id (-1 when absent)
+    
+    Matched on the text form so int/str vdata_ids from CSV and journal agree;
+    a vdata_id that occurs several times in the file matches its first row.
+    """
+    source_ids = source_ids.astype(str)
+    first = ~source_ids.duplicated().to_numpy()
+    matches = pd.Index(source_ids[first]).get_indexer(pd.Series(vdata_ids).astype(str))
+    return np.append(np.flatnonzero(first), -1)[matches]  # get_indexer's -1 picks the trailing -1
+
+
+class ValidationStore:
+    """Validated records keyed by vdata_id with O(1) upserts
+    
+    Each validated record gets a slot holding its source row position. The
+    verdicts themselves live only in the VerdictStore (one code table), read
+    at these rows when the results are written out - the two cannot drift
+    apart. A DataFrame is only materialised on export.
+    """
+    
+    def __init__(self, verdicts, capacity=1024):
+        self.verdicts = verdicts  # VerdictStore holding the verdict codes
+        self.slots = {}  # vdata_id -> slot
+        self.rows = np.zeros(capacity, dtype=np.int64)  # slot -> row position in the source frame
+    
+    def __len__(self):
+        return len(self.slots)
+    
+    def upsert(self, vdata_id, row):
+        """Add the record for a verdict if it is new - the verdict goes to the VerdictStore"""
+        slot = self.slots.get(vdata_id)
+        if slot is None:
+            slot = len(self.slots)
+            if slot == len(self.rows):
+                self.rows = np.resize(self.rows, len(self.rows) * 2)
+            self.slots[vdata_id] = slot
+            self.rows[slot] = row
+        return slot
+    
+    @classmethod
+    def from_verdicts(cls, source_df, verdicts):
+        """Vectorised bulk load of saved verdicts, matched to source rows by vdata_id
+        
+        verdicts has vdata_id, fr_validation and re_validation columns. Returns
+        (store, unmatched) where unmatched counts verdicts whose vdata_id is not
+        in source_df; store.verdicts is the VerdictStore of source_df.
+        """
+        matches = match_vdata_ids(source_df['vdata_id'], verdicts['vdata_id'])
+        found = matches >= 0
+        verdicts = verdicts[found]
+        rows = matches[found]
+        
+        order = np.argsort(rows, kind='stable')  # Slots in file order
+        rows = rows[order]
+        verdict_store = VerdictStore(len(source_df))
+        for side, column in SIDE_COLUMNS.items():
+            verdict_store.set_rows(rows, side, verdicts[column].to_numpy()[order])
+        verdict_store.recount()
+        
+        store = cls(verdict_store, max(1024, len(rows)))
+        store.rows[:len(rows)] = rows
+        store.slots = dict(zip(source_df['vdata_id'].to_numpy()[rows], range(len(rows))))
+        return store, int((~found).sum())
+    
+    def verdict_arrays(self):
+        """(rows, {column: verdict strings}) for every validated record"""
+        count = len(self.slots)
+        rows = self.rows[:count]
+        if count:
+            self.verdicts.reserve(int(rows.max()))
+        names = np.array(self.verdicts.code_names, dtype=object)
+        return rows, {column: names[self.verdicts.codes[side][rows]] for side, column in SIDE_COLUMNS.items()}
+    
+    def to_frame(self, source):
+        """Validated rows as a DataFrame: all source columns + fr_validation / re_validation
+        
+        source is a detection source - only the validated rows are read from it.
+        """
+        rows, verdicts = self.verdict_arrays()
+        frame = source.fetch_rows(rows).reset_index(drop=True)
+        for column, values in verdicts.items():
+            frame[column] = values
+        return frame
+
+
+class VerdictStore:
+    """Verdict code of every record and side, with running counts
+    
+    codes[side] is a small integer array indexed by record position:
+    0 = not validated, 1 = correct, higher = an error code (see code_names).
+    Every set() updates per-code counts, per-side totals and the number of
+    fully validated records, so statistics never need a pass over the data.
+    """
+    
+    CORRECT = 1
+    
+    def __init__(self, record_count=0):
+        capacity = max(1024, record_count)
+        self.codes = {side: np.zeros(capacity, dtype=np.int16) for side in SIDE_COLUMNS}
+        self.code_names = ['', 'correct']
+        self.code_ids = {'': 0, 'correct': self.CORRECT}
+        self.counts = {side: np.zeros(16, dtype=np.int64) for side in SIDE_COLUMNS}  # code -> records
+        self.validated = {side: 0 for side in SIDE_COLUMNS}
+        self.complete = 0  # Records with both sides validated
+    
+    def code_for(self, value):
+        code = self.code_ids.get(value)
+        if code is None:
+            code = self.code_ids[value] = len(self.code_names)
+            self.code_names.append(value)
+            for side, counts in self.counts.items():
+                if code >= len(counts):
+                    self.counts[side] = np.concatenate([counts, np.zeros(len(counts), dtype=np.int64)])
+        return code
+    
+    def reserve(self, index):
+        """Make room for record position index"""
+        capacity = len(self.codes['front'])
+        if index < capacity:
+            return
+        while capacity <= index:
+            capacity *= 2
+        for side, codes in self.codes.items():
+            grown = np.zeros(capacity, dtype=codes.dtype)
+            grown[:len(codes)] = codes
+            self.codes[side] = grown
+    
+    def set(self, index, side, value):
+        """Record a verdict ('' clears it) and update the counters"""
+        self.reserve(index)
+        code = self.code_for(value)
+        codes = self.codes[side]
+        old = int(codes[index])
+        if old == code:
+            return
+        other = self.codes['rear' if side == 'front' else 'front'][index]
+        was_complete = bool(old and other)
+        
+        codes[index] = code
+        if old:
+            self.counts[side][old] -= 1
+            self.validated[side] -= 1
+        if code:
+            self.counts[side][code] += 1
+            self.validated[side] += 1
+        self.complete += bool(code and other) - was_complete
+    
+    def get(self, index, side):
+        if index >= len(self.codes[side]):
+            return ''
+        return self.code_names[self.codes[side][index]]
+    
+    def is_complete(self, index):
+        """Both sides of the record have a verdict"""
+        return index < len(self.codes['front']) and bool(self.codes['front'][index] and self.codes['rear'][index])
+    
+    def correct(self, side):
+        return int(self.counts[side][self.CORRECT])
+    
+    def wrong(self, side):
+        return self.validated[side] - self.correct(side)
+    
+    def error_counts(self, side=None):
+        """Verdicts per error code, for one side or both"""
+        sides = [side] if side else list(SIDE_COLUMNS)
+        return {name: sum(int(self.counts[s][code]) for s in sides)
+                for code, name in enumerate(self.code_names) if code > self.CORRECT}
+    
+    def totals(self):
+        """Verdict counts over both sides: validated, correct and wrong"""
+        validated = sum(self.validated.values())
+        correct = sum(self.correct(side) for side in SIDE_COLUMNS)
+        return {'validated': validated, 'correct': correct, 'wrong': validated - correct}
+    
+    def legacy_results(self):
+        """{"<index>_<side>": is_correct} as the old validation_results export had it"""
+        results = {}
+        for side, codes in self.codes.items():
+            for index in np.flatnonzero(codes):
+                results[f"{index}_{side}"] = bool(codes[index] == self.CORRECT)
+        return results
+    
+    def set_rows(self, rows, side, values):
+        """Vectorised set() of many records' verdicts without counting - call recount() after"""
+        if len(rows):
+            self.reserve(int(rows.max()))
+        codes, uniques = pd.factorize(values)
+        code_map = np.array([self.code_for(value) for value in uniques] + [0], dtype=np.int16)
+        self.codes[side][rows] = code_map[codes]  # factorize marks missing as -1 -> code 0
+    
+    def recount(self):
+        """Rebuild the running counts from the codes in one pass"""
+        for side, codes in self.codes.items():
+            counts = np.bincount(codes, minlength=len(self.counts[side])).astype(np.int64)
+            counts[0] = 0
+            self.counts[side] = counts
+            self.validated[side] = int(counts.sum())
+        self.complete = int(((self.codes['front'] > 0) & (self.codes['rear'] > 0)).sum())
+
+
+def read_saved_verdicts(output_path, journal_path):
+    """Verdicts from an earlier session: the validated file overlaid with its journal
+    
+    Returns a DataFrame with vdata_id (as text), fr_validation and re_validation,
+    or None if nothing was saved yet. Later journal entries win.
+    """
+    frames = []
+    saved_path = find_saved_output(output_path)
+    if saved_path:
+        saved = read_table_columns(saved_path, ['vdata_id', *VALIDATION_COLUMNS])
+        if saved is not None:
+            frames.append(saved.set_index('vdata_id'))
+    
+    entries = []
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    pass  # Torn last line after a crash
+    if entries:
+        journal = pd.DataFrame(entries, columns=['vdata_id', 'column', 'value'])
+        journal['vdata_id'] = journal['vdata_id'].astype(str)
+        journal = journal.drop_duplicates(['vdata_id', 'column'], keep='last')
+        journal = journal.pivot(index='vdata_id', columns='column', values='value')
+        frames.insert(0, journal.reindex(columns=list(VALIDATION_COLUMNS)))
+    
+    if not frames:
+        return None
+    frames = [frame[~frame.index.duplicated(keep='last')] for frame in frames]
+    verdicts = frames[0]
+    for frame in frames[1:]:
+        verdicts = verdicts.combine_first(frame)
+    verdicts = verdicts.fillna('')
+    verdicts.index.name = 'vdata_id'
+    return verdicts.reset_index()
+
+
+def json_default(value):
+    """json.dumps fallback for numpy/pandas scalars (e.g. int64 vdata_ids)"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class ValidationJournal:
+    """Append-only JSON-lines log of verdicts
+    
+    Every entry is flushed to the OS immediately and fsync'ed in batches, so a
+    crash loses at most the last un-synced batch. The full _VALIDATED.csv is
+    only written when the journal is compacted (save / exit).
+    """
+    
+    def __init__(self, path, batch_size=20, sync_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.file = open(path, 'a', encoding='utf-8')
+    
+    def append(self, entry):
+        self.file.write(json.dumps(entry, default=json_default) + '\n')
+        self.file.flush()
+        self.unsynced += 1
+        if self.unsynced >= self.batch_size or time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+    
+    def sync(self):
+        """fsync the batch written since the last sync"""
+        if self.unsynced:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+        self.last_sync = time.monotonic()
+    
+    def truncate(self):
+        """Empty the journal once its entries are safely in the compacted CSV"""
+        self.file.truncate(0)
+        self.sync()
+    
+    def close(self):
+        self.sync()
+        self.file.close()
+
+
+class ReviewLog:
+    """Timing of every verdict of a review session
+    
+    Each verdict is kept with its monotonic time, the record it belongs to and
+    the view it was given in (one view = one display of a record), its dwell
+    time (record displayed -> verdict), the part of it spent waiting for the
+    images and whether they came from the prefetch cache.
+    """
+    
+    COLUMNS = ['time', 'view', 'index', 'vdata_id', 'side', 'value', 'dwell_ms', 'wait_ms', 'cached']
+    
+    def __init__(self):
+        self.started = time.monotonic()
+        self.started_at = time.time()
+        self.entries = []
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def add(self, view, index, vdata_id, side, value, timing):
+        """timing: dict with time, dwell_ms, wait_ms and cached"""
+        self.entries.append((timing['time'], view, index, vdata_id, side, value,
+                             timing['dwell_ms'], timing['wait_ms'], timing['cached']))
+    
+    def to_frame(self):
+        return pd.DataFrame(self.entries, columns=self.COLUMNS)
+    
+    def summary(self, slowest=10):
+        """Verdicts per hour, time waiting for images vs deciding, cache effect and slowest records"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        summary = {'verdicts': len(self.entries), 'session_minutes': round(elapsed / 60, 2),
+                   'verdicts_per_hour': round(len(self.entries) * 3600 / elapsed, 1)}
+        if not self.entries:
+            return summary
+        
+        # A view's time is its longest dwell (its last verdict); its wait happened once
+        frame = self.to_frame()
+        views = frame.groupby('view').agg(index=('index', 'first'), vdata_id=('vdata_id', 'first'),
+                                          dwell_ms=('dwell_ms', 'max'), wait_ms=('wait_ms', 'first'),
+                                          cached=('cached', 'first'), verdicts=('value', 'size'))
+        views['wait_ms'] = views[['wait_ms', 'dwell_ms']].min(axis=1)
+        reviewing = views['dwell_ms'].sum()
+        waiting = views['wait_ms'].sum()
+        summary.update({
+            'records': len(views),
+            'reviewing_minutes': round(reviewing / 60000, 2),
+            'waiting_minutes': round(waiting / 60000, 2),
+            'deciding_minutes': round((reviewing - waiting) / 60000, 2),
+            'waiting_share': round(waiting / reviewing, 4) if reviewing else None,
+            'cached_share': round(float(views['cached'].mean()), 4),
+            'median_record_ms': round(float(views['dwell_ms'].median()), 1),
+            'median_record_ms_cached': round(float(views.loc[views['cached'], 'dwell_ms'].median()), 1)
+                                       if views['cached'].any() else None,
+            'median_record_ms_uncached': round(float(views.loc[~views['cached'], 'dwell_ms'].median()), 1)
+                                         if (~views['cached']).any() else None,
+            'median_wait_ms': round(float(views['wait_ms'].median()), 1),
+        })
+        slow = views.sort_values('dwell_ms', ascending=False).head(slowest)
+        summary['slowest_records'] = [
+            {'vdata_id': vdata_id, 'index': int(index), 'dwell_ms': round(float(dwell), 1),
+             'wait_ms': round(float(wait), 1), 'cached': bool(cached)}
+            for vdata_id, index, dwell, wait, cached in
+            zip(slow['vdata_id'], slow['index'], slow['dwell_ms'], slow['wait_ms'], slow['cached'])]
+        return summary
+    
+    def save(self, path):
+        """Write the summary and every timed verdict as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+                       'summary': self.summary(),
+                       'verdicts': self.to_frame().to_dict(orient='records')}, f, indent=2, default=json_default)
+
+
+# Media scan status per image side (MediaScan.status)
+MEDIA_OK = 0
+MEDIA_MISSING = 1
+MEDIA_CORRUPT = 2
+MEDIA_STATUS_NAMES = {MEDIA_OK: 'ok', MEDIA_MISSING: 'missing', MEDIA_CORRUPT: 'corrupt'}
+
+# How thoroughly scan_media checks image files
+MEDIA_CHECKS = ('exists', 'header', 'decode')
+
+
+def check_image_file(path, verify='header'):
+    """MEDIA_OK or MEDIA_CORRUPT for an indexed image file - runs in scan worker processes
+    
+    'header' parses the image header and checks that a JPEG still has its
+    end-of-image marker (truncated copies/uploads); 'decode' decodes the pixels.
+    """
+    try:
+        if verify == 'decode':
+            with Image.open(path) as img:
+                img.load()
+            return MEDIA_OK
+        
+        with open(path, 'rb') as f:
+            if f.read(2) == b'\xff\xd8':
+                f.seek(max(0, os.fstat(f.fileno()).st_size - 1024))
+                if b'\xff\xd9' not in f.read():
+                    return MEDIA_CORRUPT
+        with Image.open(path) as img:
+            img.size
+        return MEDIA_OK
+    except Exception:  # PIL raises many different errors for broken files
+        return MEDIA_CORRUPT
+
+
+def check_image_files(paths, verify='header', workers=None):
+    """check_image_file for many paths, in a process pool when it is worth it"""
+    if len(paths) < 256 or workers == 1:
+        return [check_image_file(path, verify) for path in paths]
+    # Never fork: the caller is a thread of a process whose other threads (Tk, prefetch) hold locks
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as pool:
+        return list(pool.map(check_image_file, paths, [verify] * len(paths), chunksize=64))
+
+
+class MediaScan:
+    """Image availability of every record, found by ValidationEngine.scan_media
+    
+    status[i, 0] / status[i, 1] are the MEDIA_* codes of record i's front / rear
+    image; ok[i] is True when both are usable.
+    """
+    
+    def __init__(self, status):
+        self.status = status
+        self.ok = (status == MEDIA_OK).all(axis=1)
+    
+    def counts(self):
+        return {'missing': int((self.status == MEDIA_MISSING).sum()),
+                'corrupt': int((self.status == MEDIA_CORRUPT).sum()),
+                'broken_records': int((~self.ok).sum())}
+    
+    def report(self, df):
+        """One row per missing / corrupt image: vdata_id, side, mediaid, status"""
+        frames = []
+        for side_index, (side, column) in enumerate((('front', 'fr_mediaid'), ('rear', 're_mediaid'))):
+            status = self.status[:, side_index]
+            broken = np.flatnonzero(status != MEDIA_OK)
+            frames.append(pd.DataFrame({
+                'vdata_id': df['vdata_id'].to_numpy()[broken],
+                'side': side,
+                'mediaid': df[column].to_numpy()[broken],
+                'status': [MEDIA_STATUS_NAMES[code] for code in status[broken]],
+                'row': broken,
+            }))
+        return pd.concat(frames, ignore_index=True).sort_values('row', kind='stable').drop(columns='row')
+    
+    def save_bitmap(self, path):
+        """ok as a packed bit array (np.unpackbits(np.load(path), count=records) restores it)"""
+        np.save(path, np.packbits(self.ok))
+
+
+# Review filter clauses (joined by 'and'), e.g. "front missing and fr_anpr != re_anpr"
+REVIEW_FILTER_EXAMPLES = ['front missing', 'rear missing', 'error code = blur', 'fr_anpr != re_anpr']
+_SIDE_MISSING = re.compile(r'^(front|rear)\s+missing$', re.IGNORECASE)
+_ERROR_CODE = re.compile(r'^(?:(front|rear)\s+)?error(?:\s+code)?\s*==?\s*(\S+)$', re.IGNORECASE)
+_COMPARISON = re.compile(r'^(\w+)\s*(==|!=|=)\s*(.+)$')
+
+
+def review_filter_mask(df, verdicts, text):
+    """Boolean mask of the records matching a review filter
+    
+    Clauses: 'front missing' / 'rear missing' (no verdict for that side yet),
+    '[front|rear] error code = <code>' (either side when no side is given) and
+    '<column> == / != <column or value>'. Raises ValueError on anything else.
+    """
+    count = len(df)
+    mask = np.ones(count, dtype=bool)
+    verdicts.reserve(count - 1)
+    for clause in re.split(r'\s+and\s+', text.strip(), flags=re.IGNORECASE):
+        if not clause:
+            continue
+        match = _SIDE_MISSING.match(clause)
+        if match:
+            mask &= verdicts.codes[match.group(1).lower()][:count] == 0
+            continue
+        match = _ERROR_CODE.match(clause)
+        if match:
+            side, code = match.group(1), verdicts.code_ids.get(match.group(2).strip('\'"'))
+            if code is None:
+                return np.zeros(count, dtype=bool)  # Code never recorded
+            sides = [side.lower()] if side else list(SIDE_COLUMNS)
+            mask &= np.logical_or.reduce([verdicts.codes[name][:count] == code for name in sides])
+            continue
+        match = _COMPARISON.match(clause)
+        if not match or match.group(1) not in df.columns:
+            raise ValueError(f"Unknown review filter: {clause}")
+        column, operator, other = match.groups()
+        other = other.strip()
+        left = df[column].fillna('').astype(str).to_numpy()
+        if other in df.columns:
+            right = df[other].fillna('').astype(str).to_numpy()
+        else:
+            right = other.strip('\'"')
+        equal = left == right
+        mask &= ~equal if operator == '!=' else equal
+    return mask
+
+
+class ReviewQueue:
+    """Record positions to review, in file order - see ValidationEngine.review_queue
+    
+    positions is a snapshot taken when the queue is built, so records validated
+    since then stay reachable when stepping back through the queue.
+    """
+    
+    def __init__(self, positions, filter_text='', pending_only=True):
+        self.positions = positions
+        self.filter_text = filter_text
+        self.pending_only = pending_only
+    
+    def __len__(self):
+        return len(self.positions)
+    
+    def candidates(self, index, step=1):
+        """Queue positions after (step=1) or before (step=-1) index, nearest first"""
+        if step > 0:
+            return self.positions[np.searchsorted(self.positions, index, 'right'):]
+        return self.positions[:np.searchsorted(self.positions, index, 'left')][::-1]
+    
+    def remaining(self, verdicts):
+        """Records of the queue still missing a front or rear verdict"""
+        if not len(self.positions):
+            return 0
+        verdicts.reserve(int(self.positions[-1]))
+        return int(((verdicts.codes['front'][self.positions] == 0) |
+                    (verdicts.codes['rear'][self.positions] == 0)).sum())
+
+
+class ValidationEngine:
+    """Validation session for one detection file - no GUI required
+    
+    Typical use:
+        engine = ValidationEngine()
+        engine.open('detections.csv')      # header + first PREVIEW_ROWS records
+        engine.load_records()              # every record (may run in a thread)
+        engine.resume()                    # merge an earlier session's verdicts
+        engine.set_image_folder('images/')
+        engine.record_verdict(0, 'front', 'correct')
+        engine.close()                     # write <name>_VALIDATED.<format>
+    """
+    
+    def __init__(self, output_format='csv', metrics=None):
+        self.metrics = metrics or Metrics()  # Hot path timings - see Metrics
+        self.df = None  # Required columns only - see CsvDetectionSource
+        self.source = None
+        self.image_folder = ""
+        self.image_index = None  # ImageIndex for image_folder - built once per folder
+        self.store = None  # ValidationStore - materialised as a DataFrame only on export
+        self.verdicts = None  # VerdictStore - per-record codes and running counts
+        self.output_format = output_format
+        self.output_path = ""  # _VALIDATED file in output_format
+        self.journal_path = ""
+        self.journal = None  # ValidationJournal - appended per verdict, compacted into output_path
+        self.resumed = False  # Saved verdicts merged into store (see resume)
+        self.read_only = False  # Opened to read the verdicts only - no journal, nothing written
+        self.detections_path = ""
+        self.session_base = ""  # <folder>/<name>[_shardKofN] - prefix of the files this session writes
+        self.shard = None  # (shard, shards, method) when reviewing one shard of the file
+        self.sampler = None  # SampleSource when auditing a sample of the file
+        self.media_scan = None  # MediaScan of df, once scan_media has run
+        self.review_log = None  # ReviewLog of the verdicts given with timings (GUI sessions)
+    
+    def open(self, path, shard=None, sample=None, read_only=False):
+        """Open a detection file: check its columns and read the first records
+        
+        shard is None or (shard, shards, method) - see ShardSource; a shard's
+        results go to files of their own (<name>_shard2of8_VALIDATED.csv) that
+        merge_outputs combines. sample is None or SampleSource keyword
+        arguments: only a stratified sample of the records is loaded (and a
+        shard is then a shard of the sample). The previous file's session is
+        compacted first. read_only sessions (stats, reports) only read the
+        saved verdicts and journal: no journal is opened and nothing is written.
+        Raises ValueError when required columns are missing or the sample
+        options are invalid.
+        """
+        source = open_detection_source(path)
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in source.columns]
+        if missing_cols:
+            raise ValueError(f"Missing columns: {', '.join(missing_cols)}")
+        
+        # Build the sample / shard before closing the current session - a bad option leaves it open
+        name = os.path.splitext(os.path.basename(path))[0]
+        sampler = None
+        if sample is not None:
+            source = sampler = SampleSource(source, **sample)
+            name += f"_{sample_name(sample)}"
+        if shard is not None:
+            number, count, method = shard
+            source = ShardSource(source, number, count, method)
+            name += f"_{'shard' if method == 'hash' else 'range'}{number + 1}of{count}"
+        
+        if self.store is not None:
+            self.close()
+        
+        self.source = source
+        self.shard = shard
+        self.sampler = sampler
+        self.df = source.read_required(nrows=PREVIEW_ROWS)
+        self.resumed = False
+        self.detections_path = path
+        self.media_scan = None
+        
+        self.session_base = os.path.join(os.path.dirname(path), name)
+        self.output_path = f"{self.session_base}_VALIDATED{OUTPUT_FORMATS[self.output_format]}"
+        self.journal_path = f"{self.session_base}_VALIDATED.journal.jsonl"
+        
+        # Verdicts recorded before resume() only go to the journal and are merged by it
+        self.read_only = read_only
+        self.journal = None if read_only else ValidationJournal(self.journal_path)
+        self.verdicts = VerdictStore(len(self.df))
+        self.store = ValidationStore(self.verdicts)
+        self.review_log = ReviewLog()
+        return self.df
+    
+    def load_records(self):
+        """Read every record of the opened file - thread-safe, assign the result to df"""
+        return self.source.load()
+    
+    def load(self, path, shard=None, sample=None, read_only=False):
+        """open + load_records + resume in one call; returns the number of resumed records"""
+        self.open(path, shard, sample, read_only)
+        self.df = self.load_records()
+        resumed, _ = self.resume()
+        return resumed
+    
+    def resume(self):
+        """Merge the saved validation file and journal into the store
+        
+        Expects df to hold every record. Returns (resumed records, saved
+        verdicts whose vdata_id is not in the file).
+        """
+        verdicts = read_saved_verdicts(self.output_path, self.journal_path)
+        unmatched = 0
+        if verdicts is None:
+            # Nothing saved yet - EMPTY store, same columns as original + validation columns on export
+            self.verdicts = VerdictStore(len(self.df))
+            self.store = ValidationStore(self.verdicts)
+            if not self.read_only:
+                write_table(self.store.to_frame(self.source), self.output_path, self.output_format)
+        else:
+            self.store, unmatched = ValidationStore.from_verdicts(self.df, verdicts)
+            self.verdicts = self.store.verdicts
+        self.resumed = True
+        return len(self.store), unmatched
+    
+    def set_image_folder(self, folder):
+        """Index an image folder (cached on disk); returns its image count"""
+        self.image_folder = folder
+        self.image_index = ImageIndex.load(folder)
+        return self.image_index.image_count
+    
+    @timed('image.resolve')
+    def resolve_image_path(self, mediaid):
+        """Full path of the image for a mediaid, or None"""
+        if not self.image_folder:
+            return None
+        if self.image_index is None or self.image_index.folder != os.path.abspath(self.image_folder):
+            self.image_index = ImageIndex.load(self.image_folder)
+        return self.image_index.resolve(mediaid)
+    
+    def scan_media(self, verify='header', workers=None, write_report=True):
+        """Resolve every fr_mediaid / re_mediaid and check the image files
+        
+        verify is one of MEDIA_CHECKS. Each distinct image is checked once,
+        in worker processes. With write_report the problems go to
+        <name>_MEDIA_REPORT.csv and the per-record availability bitmap to
+        <name>_MEDIA.npy next to the detection file (one pair per shard).
+        Returns the MediaScan.
+        """
+        # The scan runs for a while - another file may be opened meanwhile
+        df, session_base = self.df, self.session_base
+        mediaids = pd.concat([df['fr_mediaid'], df['re_mediaid']], ignore_index=True)
+        codes, uniques = pd.factorize(mediaids)  # NaN / None -> -1
+        
+        unique_status = np.full(len(uniques), MEDIA_MISSING, dtype=np.int8)
+        paths = [self.resolve_image_path(mediaid) if mediaid else None for mediaid in uniques]
+        found = [i for i, path in enumerate(paths) if path]
+        if verify == 'exists':
+            unique_status[found] = MEDIA_OK
+        else:
+            unique_status[found] = check_image_files([paths[i] for i in found], verify, workers)
+        
+        status = np.where(codes >= 0, unique_status[codes], MEDIA_MISSING).astype(np.int8)
+        scan = MediaScan(status.reshape(2, len(df)).T.copy())
+        
+        if write_report:
+            scan.report(df).to_csv(f"{session_base}_MEDIA_REPORT.csv", index=False)
+            scan.save_bitmap(f"{session_base}_MEDIA.npy")
+        if df is self.df:
+            self.media_scan = scan
+        return scan
+    
+    def next_index(self, index, step=1, skip_broken=False, queue=None, pending=False):
+        """Index of the next (step=1) or previous (step=-1) record, or None
+        
+        With skip_broken, records whose images the media scan found missing or
+        corrupt are skipped. With a ReviewQueue only its records are visited,
+        and with pending only those still missing a verdict.
+        """
+        if queue is not None:
+            return self.next_queued_index(queue, index, step, skip_broken, pending)
+        index += step
+        if skip_broken and self.media_scan is not None and len(self.media_scan.ok) == len(self.df):
+            ok = self.media_scan.ok
+            candidates = np.flatnonzero(ok[index:]) if step > 0 else np.flatnonzero(ok[:max(index + 1, 0)])
+            if not len(candidates):
+                return None
+            index = index + int(candidates[0]) if step > 0 else int(candidates[-1])
+        return index if 0 <= index < len(self.df) else None
+    
+    def next_queued_index(self, queue, index, step, skip_broken, pending):
+        """next_index within a ReviewQueue - candidates are checked a chunk at a time"""
+        candidates = queue.candidates(index, step)
+        ok = None
+        if skip_broken and self.media_scan is not None and len(self.media_scan.ok) == len(self.df):
+            ok = self.media_scan.ok
+        if pending and len(candidates):
+            self.verdicts.reserve(int(candidates.max()))
+        for start in range(0, len(candidates), 4096):
+            chunk = candidates[start:start + 4096]
+            keep = np.ones(len(chunk), dtype=bool)
+            if ok is not None:
+                keep &= ok[chunk]
+            if pending:
+                keep &= (self.verdicts.codes['front'][chunk] == 0) | (self.verdicts.codes['rear'][chunk] == 0)
+            hits = np.flatnonzero(keep)
+            if len(hits):
+                return int(chunk[hits[0]])
+        return None
+    
+    def review_queue(self, filter_text='', pending_only=True):
+        """ReviewQueue of the records matching filter_text (see review_filter_mask)
+        
+        With pending_only, only records still missing a front or rear verdict
+        are queued. Raises ValueError on an unknown filter.
+        """
+        count = len(self.df)
+        mask = review_filter_mask(self.df, self.verdicts, filter_text)
+        if pending_only:
+            mask &= (self.verdicts.codes['front'][:count] == 0) | (self.verdicts.codes['rear'][:count] == 0)
+        return ReviewQueue(np.flatnonzero(mask), filter_text, pending_only)
+    
+    def plate_box(self, index, side):
+        """Plate (left, top, right, bottom) of a record side from the CSV, or None"""
+        columns = PLATE_BOX_COLUMNS[side]
+        if not all(column in self.df.columns for column in columns):
+            return None
+        values = [self.df[column].iat[index] for column in columns]
+        if any(pd.isna(value) for value in values):
+            return None
+        left, top, right, bottom = (int(float(value)) for value in values)
+        return (left, top, right, bottom) if right > left and bottom > top else None
+    
+    def record_verdict(self, index, side, value, timing=None, view=None):
+        """Record 'correct' or an error code for one side ('front' / 'rear') of record index
+        
+        timing (time, dwell_ms, wait_ms, cached - see ReviewLog) is written to
+        the journal entry and the review log; view identifies the display of
+        the record the verdict was given in.
+        """
+        if self.read_only:
+            raise RuntimeError("Verdicts cannot be recorded in a read-only session")
+        vdata_id = self.df['vdata_id'].iat[index]
+        column = SIDE_COLUMNS[side]
+        entry = {'vdata_id': vdata_id, 'column': column, 'value': value}
+        if timing is not None:
+            entry.update(timing)
+            self.review_log.add(view, index, vdata_id, side, value, timing)
+        
+        # Add or update the record - constant time, no frame scans or copies
+        with self.metrics.timer('verdict.upsert'):
+            self.store.upsert(vdata_id, index)
+            self.verdicts.set(index, side, value)
+        
+        # Append to the journal - the full output is only rewritten on compact
+        with self.metrics.timer('verdict.journal'):
+            self.journal.append(entry)
+    
+    def first_unvalidated_index(self):
+        """First record that does not have both front and rear verdicts yet"""
+        if self.verdicts is None or not self.verdicts.complete:
+            return 0
+        count = len(self.df)
+        self.verdicts.reserve(count - 1)
+        done = (self.verdicts.codes['front'][:count] > 0) & (self.verdicts.codes['rear'][:count] > 0)
+        pending = np.flatnonzero(~done)
+        return int(pending[0]) if len(pending) else len(self.df) - 1
+    
+    def is_complete(self, index):
+        """Both sides of record index have a verdict"""
+        return self.verdicts is not None and self.verdicts.is_complete(index)
+    
+    def stats(self):
+        """Verdict counts over both sides: validated, correct and wrong"""
+        if self.verdicts is None:
+            return {'validated': 0, 'correct': 0, 'wrong': 0}
+        return self.verdicts.totals()
+    
+    def set_output_format(self, output_format):
+        """Write the results as csv, parquet or feather from now on"""
+        self.output_format = output_format
+        if self.output_path:
+            self.output_path = os.path.splitext(self.output_path)[0] + OUTPUT_FORMATS[output_format]
+    
+    def export(self, path, output_format=None):
+        """Write the validated records (all original columns + verdicts) to path"""
+        # Write to a temp file first so a crash mid-write never leaves a half file
+        tmp_path = path + '.tmp'
+        write_table(self.store.to_frame(self.source), tmp_path, output_format or self.output_format)
+        os.replace(tmp_path, path)
+    
+    @timed('verdict.compact')
+    def compact(self):
+        """Write the full validation output from memory, then empty the journal"""
+        if self.read_only:
+            return
+        if self.journal is not None:
+            self.journal.sync()
+        if not self.resumed:
+            return  # Saved verdicts are not merged yet - the journal alone holds this session
+        self.export(self.output_path)
+        if self.journal is not None:
+            self.journal.truncate()
+    
+    def sync(self):
+        if self.journal is not None:
+            self.journal.sync()
+    
+    def save_review_log(self):
+        """Write the review log to <name>_SESSION_<start time>.json; returns its path or None"""
+        if not self.review_log:
+            return None
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.review_log.started_at))
+        path = f"{self.session_base}_SESSION_{stamp}.json"
+        self.review_log.save(path)
+        return path
+    
+    def close(self):
+        """Compact and close the journal, save the review log"""
+        if self.journal is not None:
+            self.compact()
+            self.journal.close()
+            self.journal = None
+            self.save_review_log()
+
+
+def read_verdict_file(path):
+    """vdata_id + fr_validation / re_validation rows from a csv / parquet / feather file"""
+    verdicts = read_table_columns(path, ['vdata_id', *VALIDATION_COLUMNS])
+    if verdicts is None:
+        raise ValueError(f"{path} needs the columns vdata_id, {', '.join(VALIDATION_COLUMNS)}")
+    return verdicts
+
+
+def apply_verdicts(engine, verdicts):
+    """Record every non-empty verdict of a vdata_id / fr_validation / re_validation frame
+    
+    Returns (recorded verdicts, unknown vdata_ids).
+    """
+    rows = match_vdata_ids(engine.df['vdata_id'], verdicts['vdata_id'])
+    recorded = 0
+    for side, column in SIDE_COLUMNS.items():
+        for row, value in zip(rows, verdicts[column]):
+            if row >= 0 and value:
+                engine.record_verdict(row, side, value)
+                recorded += 1
+    return recorded, int((rows < 0).sum())
+
+
+def merge_outputs(paths):
+    """Combine the validation outputs of several reviewers (e.g. one per shard)
+    
+    Records are matched by vdata_id; the first file's other columns are kept.
+    A side judged differently by two files is a conflict: its merged verdict
+    is left empty so the record comes up for review again. Returns (merged,
+    conflicts) where conflicts has vdata_id, side and each file's verdict.
+    """
+    frames = []
+    for number, path in enumerate(paths):
+        frame = read_table(path)
+        missing = [column for column in ('vdata_id', *VALIDATION_COLUMNS) if column not in frame.columns]
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(missing)} column")
+        frame = frame.assign(vdata_id=frame['vdata_id'].astype(str), _input=number)
+        frames.append(frame.drop_duplicates('vdata_id', keep='last'))
+    combined = pd.concat(frames, ignore_index=True)
+    
+    # One row per (vdata_id, side, file) verdict actually given
+    verdicts = combined.melt(id_vars=['vdata_id', '_input'], value_vars=list(VALIDATION_COLUMNS),
+                             var_name='column', value_name='value')
+    verdicts['value'] = verdicts['value'].fillna('').astype(str)
+    verdicts = verdicts[verdicts['value'] != '']
+    distinct = verdicts.groupby(['vdata_id', 'column'], sort=False)['value'].transform('nunique')
+    agreed = verdicts[distinct == 1].drop_duplicates(['vdata_id', 'column'])
+    disputed = verdicts[distinct > 1]
+    
+    merged = combined.drop_duplicates('vdata_id', keep='first').drop(columns='_input').reset_index(drop=True)
+    values = agreed.pivot(index='vdata_id', columns='column', values='value')
+    for column in VALIDATION_COLUMNS:
+        column_values = values[column] if column in values.columns else pd.Series(dtype=object)
+        merged[column] = merged['vdata_id'].map(column_values).fillna('')
+    
+    names = [os.path.basename(path) for path in paths]
+    conflicts = disputed.pivot_table(index=['vdata_id', 'column'], columns='_input', values='value',
+                                     aggfunc='first', fill_value='')
+    conflicts = conflicts.rename(columns=dict(enumerate(names))).reset_index()
+    sides = {column: side for side, column in SIDE_COLUMNS.items()}
+    conflicts.insert(1, 'side', conflicts.pop('column').map(sides))
+    conflicts.columns.name = None
+    return merged, conflicts
+
+
+def parse_args(argv=None):
+    """Command line options of the headless engine"""
+    parser = argparse.ArgumentParser(description="ANPR Detection Validator Pro - headless engine")
+    parser.add_argument('--output-format', choices=sorted(OUTPUT_FORMATS), default='csv',
+                        help="format of the _VALIDATED results file (default: csv)")
+    parser.add_argument('--shard', metavar='K/N',
+                        help="work on the K-th of N shards of the detection file only")
+    parser.add_argument('--shard-method', choices=SHARD_METHODS, default='hash',
+                        help="hash: spread vdata_ids evenly (default), range: contiguous vdata_id ranges")
+    add_sample_arguments(parser)
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    stats = commands.add_parser('stats', help="print validation progress of a detection file")
+    stats.add_argument('detections', help="detection CSV / Parquet / Feather file")
+    
+    apply = commands.add_parser('apply', help="record verdicts from a file and save the validation results")
+    apply.add_argument('detections', help="detection CSV / Parquet / Feather file")
+    apply.add_argument('verdicts', help="file with vdata_id, fr_validation and re_validation columns")
+    
+    scan = commands.add_parser('scan', help="check that every record's images exist and are readable")
+    scan.add_argument('detections', help="detection CSV / Parquet / Feather file")
+    scan.add_argument('images', help="images folder")
+    scan.add_argument('--verify', choices=MEDIA_CHECKS, default='header',
+                      help="exists: index lookup only, header: parse headers (default), decode: decode pixels")
+    scan.add_argument('--workers', type=int, default=None, metavar='N',
+                      help="worker processes (default: one per CPU)")
+    
+    export = commands.add_parser('export', help="write the validated records of a detection file")
+    export.add_argument('detections', help="detection CSV / Parquet / Feather file")
+    export.add_argument('output', help="output file (.csv / .parquet / .feather)")
+    
+    merge = commands.add_parser('merge', help="combine the validation outputs of several reviewers / shards")
+    merge.add_argument('output', help="merged output file (.csv / .parquet / .feather)")
+    merge.add_argument('inputs', nargs='+', help="_VALIDATED files to combine")
+    return parser.parse_args(argv)
+
+
+def output_format_of(path):
+    """Output format for a file name's extension - csv when unknown"""
+    formats = {extension: name for name, extension in OUTPUT_FORMATS.items()}
+    return formats.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def main(argv=None):
+    """Command line entry point - see parse_args"""
+    args = parse_args(argv)
+    engine = ValidationEngine(args.output_format)
+    try:
+        if args.command == 'merge':
+            merged, conflicts = merge_outputs(args.inputs)
+            write_table(merged, args.output, output_format_of(args.output))
+            print(f"Merged {len(merged)} records from {len(args.inputs)} files into {args.output}")
+            if len(conflicts):
+                conflicts_path = os.path.splitext(args.output)[0] + "_CONFLICTS.csv"
+                conflicts.to_csv(conflicts_path, index=False)
+                print(f"Conflicting verdicts: {len(conflicts)} - left empty, see {conflicts_path}")
+            else:
+                print("Conflicting verdicts: 0")
+            return 0
+        
+        shard = None
+        if args.shard:
+            shard = (*parse_shard(args.shard), args.shard_method)
+        # Only apply records verdicts - the other commands must not touch a live session's files
+        resumed = engine.load(args.detections, shard, sample_options(args), read_only=args.command != 'apply')
+        
+        if args.command == 'apply':
+            recorded, unknown = apply_verdicts(engine, read_verdict_file(args.verdicts))
+            print(f"Recorded {recorded} verdicts ({unknown} unknown vdata_ids)")
+        elif args.command == 'scan':
+            engine.set_image_folder(args.images)
+            counts = engine.scan_media(args.verify, args.workers).counts()
+            print(f"Missing images: {counts['missing']} | Corrupt images: {counts['corrupt']} | "
+                  f"Records with broken media: {counts['broken_records']}")
+            print(f"Media report: {engine.session_base}_MEDIA_REPORT.csv")
+        elif args.command == 'export':
+            engine.export(args.output, output_format_of(args.output))
+            print(f"Exported {resumed} validated records to {args.output}")
+        
+        stats = engine.stats()
+        print(f"Records: {len(engine.df)} | Validated records: {len(engine.store)} | "
+              f"Verdicts: {stats['validated']} | Correct: {stats['correct']} | Wrong: {stats['wrong']}")
+        print(f"Validation results: {engine.output_path}")
+        engine.close()
+    except (ValueError, OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
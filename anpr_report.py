@@ -0,0 +1,263 @@
+"""Accuracy reports of ANPR Detection Validator Pro
+
+Per-side accuracy with 95% confidence intervals, error code distribution,
+front/rear verdict confusion and front-vs-rear plate agreement, computed with
+array operations over the whole detection file - fast enough for millions of
+records. For a sampled audit (--sample) each stratum's accuracy and the
+stratified estimate for the whole file are added. Used by the GUI's
+"Export Summary Report" and from the command line:
+
+    python anpr_report.py detections.csv summary.csv
+    python anpr_report.py --sample 1000 detections.csv summary.csv
+"""
+import pandas as pd
+import numpy as np
+import os
+import sys
+import json
+import argparse
+
+from anpr_core import ValidationEngine, CONFIDENCE_Z, SIDE_COLUMNS, add_sample_arguments, sample_options
+
+# Plate agreement categories (fr_anpr vs re_anpr)
+AGREEMENT_CATEGORIES = ['same', 'different', 'front_only', 'rear_only', 'none']
+
+
+def normalize_plates(plates):
+    """Upper-case plate texts without spaces / dashes / dots; missing -> ''"""
+    text = plates.fillna('').astype(str).str.upper()
+    return text.str.replace(r'[\s\-.]', '', regex=True).replace({'NAN': '', 'NONE': ''})
+
+
+def plate_agreement(df):
+    """Agreement category code (index into AGREEMENT_CATEGORIES) per record"""
+    # Normalise each distinct plate text once, then compare integer codes
+    count = len(df)
+    codes, uniques = pd.factorize(pd.concat([df['fr_anpr'], df['re_anpr']], ignore_index=True))
+    normalized_codes, normalized = pd.factorize(normalize_plates(pd.Series(uniques, dtype=object)))
+    empty = normalized.get_loc('') if '' in normalized else -2
+    plate_ids = np.where(codes >= 0, normalized_codes[codes], -1)
+    plate_ids[plate_ids == empty] = -1
+    front, rear = plate_ids[:count], plate_ids[count:]
+    has_front, has_rear = front >= 0, rear >= 0
+    
+    categories = np.full(len(df), AGREEMENT_CATEGORIES.index('none'), dtype=np.int8)
+    categories[has_front & ~has_rear] = AGREEMENT_CATEGORIES.index('front_only')
+    categories[~has_front & has_rear] = AGREEMENT_CATEGORIES.index('rear_only')
+    both = has_front & has_rear
+    categories[both] = AGREEMENT_CATEGORIES.index('different')
+    categories[both & (front == rear)] = AGREEMENT_CATEGORIES.index('same')
+    return categories
+
+
+def wilson_interval(correct, total, z=CONFIDENCE_Z):
+    """Wilson score interval (low, high) of correct / total - arrays in, arrays out; NaN where total is 0"""
+    correct = np.asarray(correct, dtype=float)
+    total = np.asarray(total, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = correct / total
+        denominator = 1 + z * z / total
+        center = (p + z * z / (2 * total)) / denominator
+        half = z * np.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return center - half, center + half
+
+
+def accuracy_table(verdicts):
+    """validated / correct / wrong / accuracy (with 95% Wilson interval) per side and for both sides"""
+    rows = []
+    for side in SIDE_COLUMNS:
+        rows.append({'side': side, 'validated': verdicts.validated[side],
+                     'correct': verdicts.correct(side), 'wrong': verdicts.wrong(side)})
+    totals = verdicts.totals()
+    rows.append({'side': 'both', 'validated': totals['validated'],
+                 'correct': totals['correct'], 'wrong': totals['wrong']})
+    table = pd.DataFrame(rows)
+    table['accuracy'] = table['correct'] / table['validated'].where(table['validated'] > 0)
+    table['ci_low'], table['ci_high'] = wilson_interval(table['correct'], table['validated'])
+    return table
+
+
+def strata_table(df, verdicts, population):
+    """Per-stratum accuracy of a sampled audit, plus the stratified estimate for the whole file
+    
+    df has the sample_stratum column of a SampleSource and population its
+    stratum sizes. The 'all (stratified)' row weights each stratum's accuracy
+    by its population share. Its 95% interval is a Wilson interval at the
+    effective sample size of the stratified design, so it keeps a sensible
+    width when every stratum is 0% or 100% accurate.
+    """
+    count = len(df)
+    names = list(population.index)
+    codes = pd.Categorical(df['sample_stratum'], categories=names).codes
+    sizes = population.to_numpy(dtype=float)
+    weights = sizes / sizes.sum()
+    table = pd.DataFrame({'stratum': names, 'population': sizes.astype(np.int64),
+                          'sampled': np.bincount(codes, minlength=len(names))})
+    verdicts.reserve(count - 1)
+    overall = {'stratum': 'all (stratified)', 'population': int(sizes.sum()), 'sampled': count}
+    for side in SIDE_COLUMNS:
+        side_codes = verdicts.codes[side][:count]
+        validated = np.bincount(codes, weights=side_codes > 0, minlength=len(names))
+        correct = np.bincount(codes, weights=side_codes == verdicts.CORRECT, minlength=len(names))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            accuracy = correct / validated
+        table[f'{side}_validated'] = validated.astype(np.int64)
+        table[f'{side}_accuracy'] = accuracy
+        table[f'{side}_ci_low'], table[f'{side}_ci_high'] = wilson_interval(correct, validated)
+        
+        # Stratified estimate over the strata reviewed so far
+        reviewed = validated > 0
+        if reviewed.any():
+            share = weights[reviewed] / weights[reviewed].sum()
+            estimate = float(np.sum(share * accuracy[reviewed]))
+            # Effective n: the simple random sample size with the same variance per unit p(1-p)
+            # (finite population corrected) - infinite when every reviewed stratum is a census
+            unit_variance = float(np.sum(share ** 2 / validated[reviewed] *
+                                         np.maximum(1 - validated[reviewed] / sizes[reviewed], 0.0)))
+            if unit_variance > 0:
+                effective = 1 / unit_variance
+                low, high = wilson_interval(estimate * effective, effective)
+                low, high = float(low), float(high)
+            else:
+                low = high = estimate
+            overall.update({f'{side}_validated': int(validated.sum()), f'{side}_accuracy': estimate,
+                            f'{side}_ci_low': low, f'{side}_ci_high': high})
+        else:
+            overall.update({f'{side}_validated': 0, f'{side}_accuracy': np.nan,
+                            f'{side}_ci_low': np.nan, f'{side}_ci_high': np.nan})
+    return pd.concat([table, pd.DataFrame([overall])], ignore_index=True)
+
+
+def error_table(verdicts):
+    """Verdicts per error code and side, with each code's share of the side's wrong verdicts"""
+    codes = [name for name in verdicts.code_names[verdicts.CORRECT + 1:]]
+    table = pd.DataFrame({'error_code': codes})
+    for side in SIDE_COLUMNS:
+        counts = verdicts.error_counts(side)
+        table[side] = [counts[code] for code in codes]
+        wrong = verdicts.wrong(side)
+        table[f'{side}_share'] = table[side] / wrong if wrong else np.nan
+    table['total'] = table[list(SIDE_COLUMNS)].sum(axis=1)
+    return table[table['total'] > 0].sort_values('total', ascending=False).reset_index(drop=True)
+
+
+def code_matrix(row_codes, column_codes, size):
+    """size x size counts of (row code, column code) pairs - one bincount"""
+    return np.bincount(row_codes.astype(np.int64) * size + column_codes, minlength=size * size).reshape(size, size)
+
+
+def confusion_table(verdicts, record_count):
+    """Front verdict x rear verdict counts over all records ('' = not validated)"""
+    size = len(verdicts.code_names)
+    verdicts.reserve(record_count - 1)
+    matrix = code_matrix(verdicts.codes['front'][:record_count], verdicts.codes['rear'][:record_count], size)
+    names = ['unvalidated'] + verdicts.code_names[1:]
+    table = pd.DataFrame(matrix, index=pd.Index(names, name='front \\ rear'), columns=names)
+    # Drop verdicts that never occur on either side
+    used = (matrix.sum(axis=0) + matrix.sum(axis=1)) > 0
+    return table.loc[used, used]
+
+
+def agreement_table(df, verdicts):
+    """Records per plate agreement category, with front / rear accuracy within each"""
+    count = len(df)
+    categories = plate_agreement(df)
+    verdicts.reserve(count - 1)
+    table = pd.DataFrame({'agreement': AGREEMENT_CATEGORIES,
+                          'records': np.bincount(categories, minlength=len(AGREEMENT_CATEGORIES))})
+    table['share'] = table['records'] / count if count else np.nan
+    for side in SIDE_COLUMNS:
+        codes = verdicts.codes[side][:count]
+        validated = np.bincount(categories, weights=codes > 0, minlength=len(AGREEMENT_CATEGORIES))
+        correct = np.bincount(categories, weights=codes == verdicts.CORRECT, minlength=len(AGREEMENT_CATEGORIES))
+        table[f'{side}_validated'] = validated.astype(np.int64)
+        table[f'{side}_accuracy'] = np.where(validated > 0, correct / np.maximum(validated, 1), np.nan)
+    return table
+
+
+def build_report(df, verdicts, population=None):
+    """All report tables for a detection frame and its VerdictStore
+    
+    population is the stratum sizes of a sampled audit (SampleSource.population).
+    """
+    report = {
+        'accuracy': accuracy_table(verdicts),
+        'errors': error_table(verdicts),
+        'confusion': confusion_table(verdicts, len(df)),
+        'agreement': agreement_table(df, verdicts),
+    }
+    if population is not None and 'sample_stratum' in df.columns:
+        report['strata'] = strata_table(df, verdicts, population)
+    return report
+
+
+def summary_table(report):
+    """The report as one long table: section, item, metric, value"""
+    frames = []
+    for section, key in (('accuracy', 'side'), ('errors', 'error_code'), ('agreement', 'agreement'),
+                         ('strata', 'stratum')):
+        if section not in report:
+            continue
+        table = report[section]
+        long = table.melt(id_vars=key, var_name='metric', value_name='value').rename(columns={key: 'item'})
+        long.insert(0, 'section', section)
+        frames.append(long)
+    confusion = report['confusion']
+    long = confusion.stack().reset_index()
+    long.columns = ['item', 'metric', 'value']
+    long.insert(0, 'section', 'confusion')
+    frames.append(long)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_report(report, path):
+    """Write the summary as CSV (long table) or JSON (one object per section)"""
+    if os.path.splitext(path)[1].lower() == '.json':
+        sections = {name: json.loads(table.reset_index().to_json(orient='records') if name == 'confusion'
+                                     else table.to_json(orient='records'))
+                    for name, table in report.items()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(sections, f, indent=2)
+    else:
+        summary_table(report).to_csv(path, index=False)
+
+
+def format_report(report):
+    """Plain text rendering for the terminal"""
+    parts = []
+    for name, table in report.items():
+        parts.append(f"== {name} ==")
+        parts.append(table.to_string(index=name == 'confusion', float_format=lambda value: f"{value:.3f}"))
+    return '\n'.join(parts)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ANPR Detection Validator Pro - accuracy report")
+    parser.add_argument('detections', help="detection CSV / Parquet / Feather file (its _VALIDATED file is read)")
+    parser.add_argument('output', nargs='?', help="summary file (.csv or .json) - printed if omitted")
+    add_sample_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point - see parse_args"""
+    args = parse_args(argv)
+    engine = ValidationEngine()
+    try:
+        engine.load(args.detections, sample=sample_options(args), read_only=True)
+        population = engine.sampler.population if engine.sampler is not None else None
+        report = build_report(engine.df, engine.verdicts, population)
+        if args.output:
+            write_report(report, args.output)
+            print(f"Report written to {args.output}")
+        else:
+            print(format_report(report))
+        engine.close()
+    except (ValueError, OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,90 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 import pandas as pd
 from PIL import Image, ImageTk
 import os
 from pathlib import Path
 import json
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import time
+
+from anpr_core import (ImageCache, ImagePrefetcher, Metrics, ValidationEngine, MEDIA_CHECKS, OUTPUT_FORMATS,
+                       POPUP_CROP_SIZE, RESAMPLE_FILTERS, REVIEW_FILTER_EXAMPLES, SHARD_METHODS, ZoomViewport,
+                       add_sample_arguments, parse_sample, parse_shard, render_viewport, sample_options, timed)
+from anpr_report import build_report, write_report
+
+# Wheel / drag idle time before zoomed views are re-rendered with LANCZOS
+POPUP_REFINE_DELAY_MS = 150
+
+# Longest wait for the next record's images before auto-advancing anyway
+AUTO_ADVANCE_MAX_WAIT_MS = 1000
+
+# Timings shown in the status bar with --metrics: (label, metric name)
+METRICS_OVERLAY = (('nav', 'display.update'), ('decode', 'image.decode'), ('resize', 'image.resize'),
+                   ('save', 'verdict.total'), ('zoom', 'zoom.render'))
+
+# Pixels the mouse must move before a press becomes a drag instead of a click
+DRAG_THRESHOLD = 3
+
+# Error codes of a wrong verdict: (button text, code)
+ERROR_OPTIONS = (("🙈 Hidden", "hidden"), ("💥 Broken", "broken"), ("❌ Fail", "fail"),
+                 ("🚗 No License Plate", "no_LP"), ("🚙 No Vehicle", "no_vehicle"), ("🌫️ Blur", "blur"),
+                 ("🏍️ Motorcycle", "moto"), ("🔄 Wrong Pair", "wrong_pair"))
+
+# Rapid mode: key -> verdict of the active side ('c' correct, 1-8 the error codes in ERROR_OPTIONS order);
+# space marks both sides correct, f / r / Tab pick the active side
+RAPID_KEYS = {'c': 'correct', **{str(number): code for number, (_, code) in enumerate(ERROR_OPTIONS, 1)}}
 
 class ANPRValidator:
-    def __init__(self, root):
+    def __init__(self, root, prefetch_ahead=3, prefetch_behind=1, prefetch_workers=2, cache_mb=1024,
+                 thumbnail_filter='lanczos', output_format='csv', prescan='header', prescan_workers=None,
+                 plate_crops=False, plate_strip=False, shard=None, sample=None, metrics=False, rapid=False):
         self.root = root
         self.root.title("ANPR Detection Validator Pro")
         self.root.geometry("1400x900")
         self.root.configure(bg='#f0f2f5')
         
-        # Data variables
-        self.df = None
-        self.current_index = 0
-        self.image_path = ""
-        self.validation_results = {}
+        # Hot path timings (--metrics) - shown in the status bar, dumped on exit
+        self.metrics = Metrics(enabled=metrics)
         
-        # NEW: Validation CSV tracking
-        self.validation_df = None
-        self.csv_output_path = ""
+        # Data variables - loading, image paths and verdicts live in the engine
+        self.engine = ValidationEngine(output_format, self.metrics)
+        self.loading = None  # Future of the background CSV load
+        self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='anpr-loader')
+        self.current_index = 0
+        self.output_format_var = tk.StringVar(value=output_format)
+        
+        # (shard, shards, method) - this reviewer loads and prefetches only that part of each CSV
+        self.shard = shard
+        if shard is not None:
+            self.root.title(f"ANPR Detection Validator Pro - shard {shard[0] + 1}/{shard[1]} ({shard[2]})")
+        
+        # SampleSource options - audit a stratified sample instead of every record
+        self.sample = sample
+        
+        # Media pre-scan after loading ('off' or one of MEDIA_CHECKS) - see start_media_scan
+        self.prescan = prescan
+        self.prescan_workers = prescan_workers
+        self.scanning = None  # Future of the background media scan
+        self.skip_broken_var = tk.BooleanVar(value=True)
+        
+        # Review queue - navigation visits only unvalidated records matching the filter
+        self.review_queue = None  # ReviewQueue, or None to visit every record
+        self.review_pending_var = tk.BooleanVar(value=True)
+        self.review_filter_var = tk.StringVar()
+        self.advancing = None  # Token of the pending auto-advance - see advance_when_ready
+        
+        # Dwell timing of the record on screen - verdicts carry it to the engine's review log
+        self.view = 0  # Displays so far - verdicts are grouped per display
+        self.shown_at = None  # time.monotonic() the record was displayed
+        self.images_ready_at = None  # ... and both its images were on screen
+        self.images_waiting = set()  # Sides still decoding
+        self.images_cached = True  # Both images came from the prefetch cache
+        
+        # Rapid mode - single keys give verdicts to the active side, no popups, instant advance
+        self.rapid_var = tk.BooleanVar(value=rapid)
+        self.rapid_side = 'front'
         
         # Image variables
         self.front_image = None
@@ -31,15 +94,26 @@ class ANPRValidator:
         self.front_image_path = None
         self.rear_image_path = None
         
+        # Decoded image cache + background decoding of the records around current_index
+        self.image_cache = ImageCache(cache_mb * 1024 * 1024, self.metrics)
+        self.thumbnail_resample = RESAMPLE_FILTERS[thumbnail_filter]
+        self.prefetch_ahead = prefetch_ahead
+        self.prefetch_behind = prefetch_behind
+        self.prefetcher = ImagePrefetcher(self.image_cache, prefetch_workers, self.thumbnail_resample)
+        
+        # Plate crops precomputed with the prefetch window - clicks on the plate and
+        # the plate strip view show them without touching the full frame
+        self.plate_crops = plate_crops or plate_strip
+        self.plate_strip_var = tk.BooleanVar(value=plate_strip)
+        
         # NEW: In-place zoom variables
         self.front_zoom_level = 1.0
         self.rear_zoom_level = 1.0
-        self.front_pan_x = 0
-        self.front_pan_y = 0
-        self.rear_pan_x = 0
-        self.rear_pan_y = 0
-        self.front_dragging = False
-        self.rear_dragging = False
+        self.front_viewport = None  # ZoomViewport while zoomed in place
+        self.rear_viewport = None
+        self.front_drag = None  # Press position / last position / moved - see on_image_press
+        self.rear_drag = None
+        self.zoom_popup = None  # Zoom inspector window, built on first use - see show_zoom_popup
         
         # Create GUI
         self.create_widgets()
@@ -134,6 +208,21 @@ class ANPRValidator:
                                           maximum=100, style='success.Horizontal.TProgressbar')
         self.progress_bar.pack(fill='x')
         
+        # Skip records whose images the media scan found missing / corrupt
+        tk.Checkbutton(info_frame, text="Skip broken media", variable=self.skip_broken_var,
+                       font=('Arial', 10), bg='#3498db', fg='white', selectcolor='#2980b9',
+                       activebackground='#3498db').pack(side='right', padx=10)
+        
+        # Review queue: unvalidated records only, optionally narrowed by a filter
+        tk.Checkbutton(btn_frame, text="Unvalidated only", variable=self.review_pending_var,
+                       font=('Arial', 10), bg='#3498db', fg='white', selectcolor='#2980b9',
+                       activebackground='#3498db', command=self.apply_review_filter).pack(side='left', padx=10)
+        filter_box = ttk.Combobox(btn_frame, textvariable=self.review_filter_var,
+                                  values=REVIEW_FILTER_EXAMPLES, width=22)
+        filter_box.pack(side='left', padx=5)
+        filter_box.bind("<<ComboboxSelected>>", lambda e: self.apply_review_filter())
+        filter_box.bind("<Return>", lambda e: self.apply_review_filter())
+        
     def create_main_content(self):
         """Create the main content area with image viewers"""
         content_frame = tk.Frame(self.root, bg='#f0f2f5')
@@ -157,6 +246,7 @@ class ANPRValidator:
         result_frame.pack_propagate(False)
         
         prefix = 'front' if 'Front' in title else 'rear'
+        setattr(self, f'{prefix}_panel', panel_frame)
         
         # Detected plate number
         setattr(self, f'{prefix}_detected_var', tk.StringVar())
@@ -185,6 +275,20 @@ class ANPRValidator:
         # Image display area
         img_frame = tk.Frame(panel_frame, bg='#ecf0f1', relief='sunken', bd=2)
         img_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        setattr(self, f'{prefix}_img_frame', img_frame)
+        
+        # Rapid mode error bar - built once, only packed while rapid mode is on
+        rapid_frame = tk.Frame(panel_frame, bg='white')
+        for key, (display_name, error_code) in zip(list(RAPID_KEYS)[1:], ERROR_OPTIONS):
+            tk.Button(rapid_frame, text=f"{key} {display_name}", font=('Arial', 8, 'bold'),
+                      bg='#c0392b', fg='white', relief='flat', padx=2,
+                      command=lambda code=error_code: self.rapid_verdict(prefix, code)).grid(
+                          row=(int(key) - 1) // 4, column=(int(key) - 1) % 4, padx=1, pady=1, sticky='ew')
+        for column in range(4):
+            rapid_frame.grid_columnconfigure(column, weight=1)
+        setattr(self, f'{prefix}_rapid_frame', rapid_frame)
+        if self.rapid_var.get():
+            rapid_frame.pack(fill='x', padx=10, before=img_frame)
         
         # ZOOM CONTROLS - Always visible
         zoom_frame = tk.Frame(img_frame, bg='#ecf0f1')
@@ -209,7 +313,7 @@ class ANPRValidator:
         instruction_frame = tk.Frame(img_frame, bg='#ecf0f1')
         instruction_frame.pack(fill='x', padx=5, pady=2)
         
-        instruction_label = tk.Label(instruction_frame, text="💡 Click on image to zoom that area | Drag to pan around", 
+        instruction_label = tk.Label(instruction_frame, text="💡 Click on image to zoom that area | Right-click for zoom window | Drag to pan around", 
                                    font=('Arial', 9), bg='#ecf0f1', fg='#7f8c8d')
         instruction_label.pack(side='left')
         
@@ -218,10 +322,11 @@ class ANPRValidator:
         canvas.pack(fill='both', expand=True, padx=5, pady=5)
         
         # Bind events for in-place zoom and pan - SIMPLE bindings
-        canvas.bind("<Button-1>", lambda e: self.on_image_click_zoom(e, prefix))
+        canvas.bind("<Button-1>", lambda e: self.on_image_press(e, prefix))
         canvas.bind("<B1-Motion>", lambda e: self.on_image_drag(e, prefix))  
         canvas.bind("<ButtonRelease-1>", lambda e: self.on_drag_end(e, prefix))
         canvas.bind("<MouseWheel>", lambda e: self.on_mouse_wheel(e, prefix))
+        canvas.bind("<Button-3>", lambda e: self.on_image_right_click(e, prefix))
         
         # Change cursor when dragging
         canvas.bind("<Enter>", lambda e: canvas.configure(cursor="hand2"))
@@ -253,11 +358,31 @@ class ANPRValidator:
                              bg='#34495e', fg='#ecf0f1', font=('Arial', 10))
         stats_label.pack(side='right', padx=10, pady=5)
         
+        # Live p50 / p95 latencies (--metrics)
+        if self.metrics.enabled:
+            self.metrics_var = tk.StringVar()
+            tk.Label(status_frame, textvariable=self.metrics_var, bg='#34495e', fg='#f1c40f',
+                     font=('Courier', 9)).pack(side='right', padx=10, pady=5)
+            self.update_metrics_overlay()
+    
+    def update_metrics_overlay(self):
+        """Refresh the status bar latency overlay once a second"""
+        parts = []
+        for label, name in METRICS_OVERLAY:
+            percentiles = self.metrics.percentiles(name)
+            if percentiles:
+                parts.append(f"{label} " + "/".join(f"{value:.1f}" if value < 10 else f"{value:.0f}"
+                                                    for value in percentiles))
+        self.metrics_var.set("⏱ p50/p95 ms: " + " · ".join(parts) if parts else "⏱ no timings yet")
+        self.root.after(1000, self.update_metrics_overlay)
+    
     def browse_csv(self):
         """Browse and select CSV file"""
         filename = filedialog.askopenfilename(
-            title="Select CSV file",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            title="Select detection file",
+            filetypes=[("Detection files", "*.csv *.parquet *.pq *.feather *.arrow *.ipc"),
+                       ("CSV files", "*.csv"), ("Parquet files", "*.parquet *.pq"),
+                       ("Arrow / Feather files", "*.feather *.arrow *.ipc"), ("All files", "*.*")]
         )
         if filename:
             self.csv_path_var.set(filename)
@@ -268,125 +393,218 @@ class ANPRValidator:
         folder = filedialog.askdirectory(title="Select Images Folder")
         if folder:
             self.img_path_var.set(folder)
-            self.image_path = folder
-            self.validate_image_path()
+            self.validate_image_path(folder)
             self.update_display()
+            self.start_media_scan()
             
-    def validate_image_path(self):
-        """Validate that the image path contains some image files"""
-        if not self.image_path or not os.path.exists(self.image_path):
+    def validate_image_path(self, folder):
+        """Validate that the image path contains some image files and index them"""
+        if not folder or not os.path.exists(folder):
             return
-            
-        # Count image files in the directory
-        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
-        image_count = 0
         
         try:
-            for file in os.listdir(self.image_path):
-                if any(file.lower().endswith(ext) for ext in image_extensions):
-                    image_count += 1
-                    
+            # Index the folder ONCE (cached on disk) - load_image resolves through this index
+            image_count = self.engine.set_image_folder(folder)
+            
             if image_count > 0:
                 self.status_var.set(f"Found {image_count} image files in selected folder")
             else:
                 self.status_var.set("⚠️ No image files found in selected folder")
                 messagebox.showwarning("Warning", 
-                                     f"No image files found in:\n{self.image_path}\n\n" +
+                                     f"No image files found in:\n{folder}\n\n" +
                                      "Please select the correct folder containing your .jpg/.png images.")
         except Exception as e:
             self.status_var.set(f"Error accessing folder: {str(e)}")
-            
+    
     def load_csv(self):
-        """Load CSV file and initialize data"""
+        """Load CSV file and initialize data - first records show at once, the rest loads in the background"""
         try:
             csv_path = self.csv_path_var.get()
             if not csv_path:
                 return
-                
-            self.df = pd.read_csv(csv_path)
-            
-            # Validate required columns
-            required_cols = ['vdata_id', 'fr_anpr', 're_anpr', 'fr_mediaid', 're_mediaid']
-            missing_cols = [col for col in required_cols if col not in self.df.columns]
             
-            if missing_cols:
-                messagebox.showerror("Error", f"Missing columns: {', '.join(missing_cols)}")
+            # Validates the required columns, finishes the previous session's validation CSV
+            # and shows the first records immediately, whatever the file size
+            try:
+                self.engine.open(csv_path, self.shard, self.sample)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
                 return
             
-            # CREATE VALIDATION CSV with new columns
-            self.create_validation_csv(csv_path)
-                
             self.current_index = 0
-            self.validation_results = {}
+            self.review_queue = None
             self.update_navigation()
             self.update_display()
+            if self.sample is not None:
+                self.status_var.set(f"Drawing a sample of {os.path.basename(csv_path)} in the background...")
+            else:
+                self.status_var.set(f"Loading all records from {os.path.basename(csv_path)} in the background...")
             
-            self.status_var.set(f"Loaded {len(self.df)} records from CSV - Empty validation CSV created!")
-            messagebox.showinfo("Success", f"Successfully loaded {len(self.df)} records!\n\n"
-                              f"Empty validation CSV created: {self.csv_output_path}\n"
-                              f"Records will be added only when you validate them!")
-            
+            future = self.loader.submit(self.engine.source.load)
+            self.loading = future
+            self.root.after(100, lambda: self.poll_csv_loading(csv_path, future))
+        
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load CSV: {str(e)}")
     
-    def create_validation_csv(self, original_csv_path):
-        """Create EMPTY validation CSV - only add rows when validated"""
+    def load_csv_sample(self):
+        """Ask for a sample size or margin of error, then load a stratified sample of the CSV"""
+        text = simpledialog.askstring("Sample Audit",
+                                      "Records to review (e.g. 1000) or margin of error (e.g. 3%).\n"
+                                      "Leave empty to load every record.", parent=self.root)
+        if text is None:
+            return
+        text = text.strip()
         try:
-            # Create EMPTY dataframe with same columns as original + validation columns
-            columns = list(self.df.columns) + ['fr_validation', 're_validation']
-            self.validation_df = pd.DataFrame(columns=columns)
+            self.sample = parse_sample(text) if text else None
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if not self.csv_path_var.get():
+            self.browse_csv()  # Loads once a file is picked
+        else:
+            self.load_csv()
+    
+    def poll_csv_loading(self, csv_path, future):
+        """Wait (without blocking Tk) for the background load started by load_csv"""
+        if self.loading is not future:
+            return  # Another CSV was loaded meanwhile
+        if not future.done():
+            self.root.after(100, lambda: self.poll_csv_loading(csv_path, future))
+            return
+        
+        self.loading = None
+        try:
+            self.engine.df = future.result()
             
-            # Create output filename
-            csv_name = os.path.splitext(os.path.basename(original_csv_path))[0]
-            csv_dir = os.path.dirname(original_csv_path)
-            self.csv_output_path = os.path.join(csv_dir, f"{csv_name}_VALIDATED.csv")
+            # CREATE or RESUME the validation CSV with new columns
+            resumed = self.create_validation_csv()
             
-            # Save EMPTY CSV with just headers
-            self.validation_df.to_csv(self.csv_output_path, index=False)
+            # Continue at the first record that still needs a verdict
+            self.current_index = self.engine.first_unvalidated_index()
+            self.build_review_queue()
+            self.update_navigation()
+            self.update_display()
+            self.start_media_scan()
+            
+            if self.engine.sampler is not None:
+                population = self.engine.sampler.population
+                self.status_var.set(f"Sampled {len(self.engine.df)} of {population.sum()} records from "
+                                    f"{len(population)} strata - resumed {resumed} validated records")
+            elif resumed:
+                self.status_var.set(f"Loaded {len(self.engine.df)} records - resumed {resumed} validated records")
+                messagebox.showinfo("Success", f"Successfully loaded {len(self.engine.df)} records!\n\n"
+                                  f"Resumed {resumed} validated records from: {self.engine.output_path}\n"
+                                  f"Continuing at record {self.current_index + 1}.")
+            else:
+                self.status_var.set(f"Loaded {len(self.engine.df)} records from CSV - Empty validation CSV created!")
+                messagebox.showinfo("Success", f"Successfully loaded {len(self.engine.df)} records!\n\n"
+                                  f"Empty validation CSV created: {self.engine.output_path}\n"
+                                  f"Records will be added only when you validate them!")
             
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load CSV: {str(e)}")
+    
+    def start_media_scan(self, verify=None):
+        """Check every record's images in the background once the CSV and image folder are loaded"""
+        verify = verify or self.prescan
+        if verify == 'off' or self.engine.df is None or self.loading is not None or not self.engine.image_folder:
+            return
+        
+        future = self.loader.submit(self.engine.scan_media, verify, self.prescan_workers)
+        self.scanning = future
+        self.root.after(200, lambda: self.poll_media_scan(future))
+    
+    def poll_media_scan(self, future):
+        """Wait (without blocking Tk) for the scan started by start_media_scan"""
+        if self.scanning is not future:
+            return  # Superseded by a newer scan
+        if not future.done():
+            self.root.after(200, lambda: self.poll_media_scan(future))
+            return
+        
+        self.scanning = None
+        try:
+            counts = future.result().counts()
+        except Exception as e:
+            self.status_var.set(f"⚠️ Media scan failed: {str(e)}")
+            return
+        
+        if counts['broken_records']:
+            report = self.engine.session_base + "_MEDIA_REPORT.csv"
+            self.status_var.set(f"⚠️ Media scan: {counts['missing']} missing, {counts['corrupt']} corrupt images in "
+                                f"{counts['broken_records']} records - see {os.path.basename(report)}")
+        else:
+            self.status_var.set("✅ Media scan: all images found and readable")
+    
+    def create_validation_csv(self):
+        """Create the validation CSV, or resume it if an earlier session left one
+        
+        Returns the number of resumed validated records.
+        """
+        try:
+            # Merge back the saved CSV and the journal, including verdicts made while loading
+            resumed, unmatched = self.engine.resume()
+            if unmatched:
+                messagebox.showwarning("Warning", f"{unmatched} saved validations have a vdata_id that is "
+                                                  f"not in this CSV and were not resumed.")
+            return resumed
+        
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create validation CSV: {str(e)}")
+            return 0
     
+    @timed('verdict.total')
     def add_validated_record(self, prefix, validation_status):
         """Add current record to validation CSV when validated"""
         try:
-            if self.validation_df is None or self.df is None:
+            if self.engine.store is None or self.engine.df is None:
                 return
             
-            current_row = self.df.iloc[self.current_index].copy()
-            
-            # Check if this record is already in validation CSV
-            existing_record = self.validation_df[
-                self.validation_df['vdata_id'] == current_row['vdata_id']
-            ]
-            
-            if len(existing_record) == 0:
-                # NEW RECORD - Add it to validation CSV
-                new_row = current_row.to_dict()
-                new_row['fr_validation'] = ''  # Empty initially
-                new_row['re_validation'] = ''  # Empty initially
-                
-                # Add the row
-                new_df_row = pd.DataFrame([new_row])
-                self.validation_df = pd.concat([self.validation_df, new_df_row], ignore_index=True)
-            
-            # Update the validation status for the correct column
-            column_name = 'fr_validation' if prefix == 'front' else 're_validation'
-            self.validation_df.loc[
-                self.validation_df['vdata_id'] == current_row['vdata_id'], 
-                column_name
-            ] = validation_status
-            
-            # Save updated CSV
-            self.validation_df.to_csv(self.csv_output_path, index=False)
+            self.engine.record_verdict(self.current_index, prefix, validation_status,
+                                       self.verdict_timing(), self.view)
             
             # Update status with record count
-            total_validated = len(self.validation_df)
+            total_validated = len(self.engine.store)
             self.status_var.set(f"✅ {validation_status} recorded! Total validated records: {total_validated}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update validation CSV: {str(e)}")
     
+    def verdict_timing(self):
+        """Dwell time of the record on screen, and how much of it was spent waiting for images"""
+        now = time.monotonic()
+        shown_at = self.shown_at if self.shown_at is not None else now
+        ready_at = self.images_ready_at if self.images_ready_at is not None else now
+        return {'time': round(now, 3), 'dwell_ms': round((now - shown_at) * 1000, 1),
+                'wait_ms': round((ready_at - shown_at) * 1000, 1), 'cached': self.images_cached}
+    
+    def image_ready(self, prefix):
+        """An image of the current record is on screen - the wait ends with the last one"""
+        self.images_waiting.discard(prefix)
+        if not self.images_waiting and self.images_ready_at is None:
+            self.images_ready_at = time.monotonic()
+    
+    def show_session_summary(self):
+        """Verdicts per hour, waiting vs deciding and the slowest records of this session"""
+        review_log = self.engine.review_log
+        if not review_log:
+            messagebox.showinfo("Session Summary", "No verdicts given in this session yet")
+            return
+        summary = review_log.summary(slowest=5)
+        slowest = "\n".join(f"  {entry['vdata_id']}: {entry['dwell_ms'] / 1000:.1f} s"
+                            f"{' (waited %.1f s)' % (entry['wait_ms'] / 1000) if entry['wait_ms'] >= 100 else ''}"
+                            for entry in summary['slowest_records'])
+        messagebox.showinfo("Session Summary",
+                            f"Verdicts: {summary['verdicts']} in {summary['session_minutes']:.0f} min "
+                            f"({summary['verdicts_per_hour']:.0f} per hour)\n"
+                            f"Records: {summary['records']} - median {summary['median_record_ms'] / 1000:.1f} s\n\n"
+                            f"Deciding: {summary['deciding_minutes']:.1f} min\n"
+                            f"Waiting for images: {summary['waiting_minutes']:.1f} min "
+                            f"({summary['waiting_share']:.0%})\n"
+                            f"Images from cache: {summary['cached_share']:.0%} of records\n\n"
+                            f"Slowest records:\n{slowest}")
+    
     def show_error_options(self, prefix):
         """Show error selection popup - BIGGER with separate Hidden/Broken"""
         # Create popup window - BIGGER SIZE!
@@ -417,23 +635,11 @@ class ANPRValidator:
                                  font=('Arial', 11), bg='#2c3e50', fg='#ecf0f1')
         subtitle_label.pack(pady=(0, 15))
         
-        # Error options - SEPARATED Hidden and Broken!
-        error_options = [
-            ("🙈 Hidden", "hidden"),
-            ("💥 Broken", "broken"),
-            ("❌ Fail", "fail"),
-            ("🚗 No License Plate", "no_LP"),
-            ("🚙 No Vehicle", "no_vehicle"),
-            ("🌫️ Blur", "blur"),
-            ("🏍️ Motorcycle", "moto"),
-            ("🔄 Wrong Pair", "wrong_pair")
-        ]
-        
-        # Create buttons in a grid - 2 columns, 4 rows
+        # Create buttons in a grid - 2 columns, 4 rows - SEPARATED Hidden and Broken!
         button_frame = tk.Frame(main_frame, bg='#2c3e50')
         button_frame.pack(fill='both', expand=True, pady=10)
         
-        for i, (display_name, error_code) in enumerate(error_options):
+        for i, (display_name, error_code) in enumerate(ERROR_OPTIONS):
             btn = tk.Button(button_frame, 
                            text=display_name,
                            font=('Arial', 12, 'bold'),
@@ -473,12 +679,8 @@ class ANPRValidator:
     
     def select_error(self, popup, prefix, error_code):
         """Handle error selection"""
-        # Add/Update record in CSV with error code
+        # Add/Update record in CSV with error code - statistics follow incrementally
         self.add_validated_record(prefix, error_code)
-        
-        # Update validation results for statistics
-        key = f"{self.current_index}_{prefix}"
-        self.validation_results[key] = False  # Mark as incorrect
         self.update_validation_stats()
         
         # Close popup
@@ -486,23 +688,23 @@ class ANPRValidator:
         
         # NO MORE ANNOYING CONFIRMATION POPUP - Just update status bar!
         error_display = error_code.replace('_', ' ').title()
-        total_validated = len(self.validation_df)
+        total_validated = len(self.engine.store)
         self.status_var.set(f"❌ {error_display} recorded for {prefix} plate | Total validated: {total_validated}")
         
         # Check if both plates are validated for auto-advance
-        front_key = f"{self.current_index}_front"
-        rear_key = f"{self.current_index}_rear"
-        
-        if front_key in self.validation_results and rear_key in self.validation_results:
-            self.root.after(500, self.next_record)  # FASTER auto-advance - no delay for popup
+        if self.engine.is_complete(self.current_index):
+            self.advance_when_ready()
             
     def update_navigation(self):
         """Update navigation buttons and progress"""
-        if self.df is None:
+        if self.engine.df is None:
             return
             
-        total = len(self.df)
+        total = len(self.engine.df)
         current = self.current_index + 1
+        if total == 0:
+            self.record_info.config(text="No records yet")
+            return
         
         self.record_info.config(text=f"Record {current} of {total}")
         self.progress_var.set(int((current / total) * 100))
@@ -514,22 +716,23 @@ class ANPRValidator:
         
     def update_validation_stats(self):
         """Update validation statistics"""
-        if not self.validation_results:
+        verdicts = self.engine.verdicts
+        if verdicts is None or not any(verdicts.validated.values()):
             self.stats_var.set("")
             return
-            
-        total = len(self.validation_results)
-        correct = sum(1 for v in self.validation_results.values() if v)
-        incorrect = total - correct
         
-        self.stats_var.set(f"Validated: {total} | Correct: {correct} | Wrong: {incorrect}")
+        # Running counters of the verdict store - no pass over the verdicts
+        totals = verdicts.totals()
+        self.stats_var.set(f"Validated: {totals['validated']} | Correct: {totals['correct']} | "
+                           f"Wrong: {totals['wrong']} | Complete records: {verdicts.complete}")
         
+    @timed('display.update')
     def update_display(self):
         """Update the display with current record data"""
-        if self.df is None or self.current_index >= len(self.df):
+        if self.engine.df is None or self.current_index >= len(self.engine.df):
             return
             
-        current_row = self.df.iloc[self.current_index]
+        current_row = self.engine.df.iloc[self.current_index]
         
         # Update detected plate numbers
         self.front_detected_var.set(current_row.get('fr_anpr', 'N/A'))
@@ -539,73 +742,126 @@ class ANPRValidator:
         self.front_filename_var.set(f"File: {current_row.get('fr_mediaid', 'N/A')}")
         self.rear_filename_var.set(f"File: {current_row.get('re_mediaid', 'N/A')}")
         
-        # Load and display images
+        # Start of the record's dwell time - see verdict_timing
+        self.view += 1
+        self.shown_at = time.monotonic()
+        self.images_ready_at = None
+        self.images_waiting = set()
+        self.images_cached = True
+        
+        # Rapid mode starts on the first side still missing a verdict
+        if self.rapid_var.get():
+            verdicts = self.engine.verdicts
+            front_done = verdicts is not None and verdicts.get(self.current_index, 'front')
+            self.set_rapid_side('rear' if front_done else 'front')
+        
+        # Queue decoding for this record and its neighbours, then show images
+        self.schedule_prefetch()
         self.load_images(current_row)
+        if not self.images_waiting:
+            self.images_ready_at = self.shown_at  # Prefetched - on screen at once
         
         self.status_var.set(f"Viewing record {self.current_index + 1} - ID: {current_row.get('vdata_id', 'N/A')}")
+    
+    def fit_target_size(self, prefix):
+        """Size an image must fit into on the canvas (same margins as display_image_normal)"""
+        canvas = getattr(self, f'{prefix}_canvas')
+        canvas_width = canvas.winfo_width()
+        canvas_height = canvas.winfo_height()
+        if canvas_width <= 1 or canvas_height <= 1:
+            canvas_width, canvas_height = 400, 300  # Not mapped yet
+        return (max(1, canvas_width - 20), max(1, canvas_height - 20))
+    
+    def schedule_prefetch(self):
+        """Prefetch the current record, the next N and the previous ones - in that order"""
+        if self.engine.df is None or not self.engine.image_folder:
+            return
+        
+        indexes = [self.current_index]
+        if self.review_queue is None:
+            indexes += [self.current_index + i for i in range(1, self.prefetch_ahead + 1)]
+            indexes += [self.current_index - i for i in range(1, self.prefetch_behind + 1)]
+        else:
+            # Neighbours in the review queue - the records Next / Previous will show
+            candidates = self.review_queue.candidates(self.current_index, 1)
+            indexes += [int(index) for index in candidates[:self.prefetch_ahead]]
+            candidates = self.review_queue.candidates(self.current_index, -1)
+            indexes += [int(index) for index in candidates[:self.prefetch_behind]]
+        
+        keys = []
+        plates = []
+        for index in indexes:
+            if not 0 <= index < len(self.engine.df):
+                continue
+            row = self.engine.df.iloc[index]
+            for prefix, column in (('front', 'fr_mediaid'), ('rear', 're_mediaid')):
+                mediaid = row.get(column)
+                if not mediaid or pd.isna(mediaid):
+                    continue
+                path = self.engine.resolve_image_path(mediaid)
+                if path:
+                    keys.append((path, self.fit_target_size(prefix)))
+                    if self.plate_crops:
+                        plates.append((path, self.engine.plate_box(index, prefix), self.fit_target_size(prefix)))
+        
+        self.prefetcher.prefetch(keys, plates)
         
     def load_images(self, row):
         """Load and display front and rear images"""
         self.load_image('front', row.get('fr_mediaid', ''))
         self.load_image('rear', row.get('re_mediaid', ''))
         
+    @timed('display.load_image')
     def load_image(self, prefix, filename):
-        """Load a single image"""
+        """Load a single image - decoded by the prefetcher, shown when ready"""
         canvas = getattr(self, f'{prefix}_canvas')
         canvas.delete("all")
         
         # Reset zoom and pan for new image
         setattr(self, f'{prefix}_zoom_level', 1.0)
-        setattr(self, f'{prefix}_pan_x', 0)
-        setattr(self, f'{prefix}_pan_y', 0)
-        
-        if not filename or not self.image_path:
+        setattr(self, f'{prefix}_viewport', None)
+        setattr(self, f'{prefix}_drag', None)
+        setattr(self, f'{prefix}_zoomed', False)
+        setattr(self, f'{prefix}_image', None)
+        setattr(self, f'{prefix}_image_size', None)
+        setattr(self, f'{prefix}_fit_image', None)
+        setattr(self, f'{prefix}_image_path', None)
+        setattr(self, f'{prefix}_pending', None)
+        setattr(self, f'{prefix}_plate_box', None)
+        
+        if not filename or pd.isna(filename) or not self.engine.image_folder:
             canvas.create_text(canvas.winfo_width()//2, canvas.winfo_height()//2, 
                              text="No image\nor path not set", 
                              font=('Arial', 14), fill='gray')
             self.update_zoom_info(prefix)
             return
         
-        # Try different file extensions and paths
-        possible_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '']
-        possible_paths = []
-        
-        # Add original filename as-is
-        for ext in possible_extensions:
-            if filename.endswith(ext) or ext == '':
-                test_filename = filename if ext == '' else filename + ext
-                possible_paths.append(os.path.join(self.image_path, test_filename))
-        
-        # Also try removing common suffixes and adding extensions
-        base_filename = filename.replace('.NaN', '').replace('.nan', '')
-        for ext in ['.jpg', '.jpeg', '.png']:
-            possible_paths.append(os.path.join(self.image_path, base_filename + ext))
-        
-        # Try looking for files that END with the CSV filename
-        if filename and self.image_path:
-            try:
-                for file in os.listdir(self.image_path):
-                    if file.endswith(filename + '.jpg') or file.endswith(filename):
-                        possible_paths.append(os.path.join(self.image_path, file))
-            except:
-                pass
-            
-        image_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                image_path = path
-                break
-        
         try:
-            if image_path and os.path.exists(image_path):
-                # Store the image path and load original image
+            # Resolve through the folder index - no directory scans per image
+            image_path = self.engine.resolve_image_path(filename)
+            
+            if image_path:
                 setattr(self, f'{prefix}_image_path', image_path)
-                img = Image.open(image_path)
-                setattr(self, f'{prefix}_image', img)  # Store original image
+                plate_box = self.engine.plate_box(self.current_index, prefix)
+                setattr(self, f'{prefix}_plate_box', plate_box)
+                future = self.prefetcher.submit(image_path, self.fit_target_size(prefix))
+                setattr(self, f'{prefix}_pending', future)
                 
-                # Display the image
-                self.update_image_display(prefix)
+                # Plate strip shows the plate crop - wait for that job too, not just the fitted frame
+                plate_future = None
+                if self.plate_strip_var.get():
+                    plate_future = self.prefetcher.submit_plate(image_path, plate_box, self.fit_target_size(prefix))
                 
+                if future.done() and (plate_future is None or plate_future.done()):
+                    # Prefetched - just swap the bitmap in
+                    self.show_prefetched_image(prefix, future)
+                else:
+                    canvas.create_text(canvas.winfo_width()//2, canvas.winfo_height()//2, 
+                                     text="Loading...", font=('Arial', 12), fill='gray')
+                    self.images_waiting.add(prefix)
+                    self.images_cached = False
+                    self.root.after(15, lambda: self.poll_prefetched_image(prefix, future, plate_future))
+            
             else:
                 canvas.create_text(canvas.winfo_width()//2, canvas.winfo_height()//2, 
                                  text=f"Image not found:\n{filename}", 
@@ -617,96 +873,57 @@ class ANPRValidator:
                              font=('Arial', 10), fill='red')
         
         self.update_zoom_info(prefix)
-
-    def load_image(self, prefix, filename):
-        """Load a single image - BACK TO SIMPLE VERSION"""
-        canvas = getattr(self, f'{prefix}_canvas')
-        canvas.delete("all")
-        
-        # Reset zoom and pan for new image
-        setattr(self, f'{prefix}_zoom_level', 1.0)
-        setattr(self, f'{prefix}_pan_x', 0)
-        setattr(self, f'{prefix}_pan_y', 0)
-        
-        if not filename or not self.image_path:
-            canvas.create_text(canvas.winfo_width()//2, canvas.winfo_height()//2, 
-                             text="No image\nor path not set", 
-                             font=('Arial', 14), fill='gray')
-            self.update_zoom_info(prefix)
-            return
-        
-        # Try different file extensions and paths
-        possible_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '']
-        possible_paths = []
-        
-        # Add original filename as-is
-        for ext in possible_extensions:
-            if filename.endswith(ext) or ext == '':
-                test_filename = filename if ext == '' else filename + ext
-                possible_paths.append(os.path.join(self.image_path, test_filename))
-        
-        # Also try removing common suffixes and adding extensions
-        base_filename = filename.replace('.NaN', '').replace('.nan', '')
-        for ext in ['.jpg', '.jpeg', '.png']:
-            possible_paths.append(os.path.join(self.image_path, base_filename + ext))
-        
-        # Try looking for files that END with the CSV filename
-        if filename and self.image_path:
-            try:
-                for file in os.listdir(self.image_path):
-                    if file.endswith(filename + '.jpg') or file.endswith(filename):
-                        possible_paths.append(os.path.join(self.image_path, file))
-            except:
-                pass
-            
-        image_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                image_path = path
-                break
-        
+    
+    def poll_prefetched_image(self, prefix, future, plate_future=None):
+        """Wait (without blocking Tk) for the worker decoding the current image (and its plate crop)"""
+        if getattr(self, f'{prefix}_pending', None) is not future:
+            return  # User already moved to another record
+        if future.done() and (plate_future is None or plate_future.done()):
+            self.show_prefetched_image(prefix, future)
+            self.image_ready(prefix)
+        else:
+            self.root.after(15, lambda: self.poll_prefetched_image(prefix, future, plate_future))
+    
+    @timed('display.show')
+    def show_prefetched_image(self, prefix, future):
+        """Display an image the prefetcher finished decoding"""
+        setattr(self, f'{prefix}_pending', None)
         try:
-            if image_path and os.path.exists(image_path):
-                # Store the image path and original image - SIMPLE!
-                setattr(self, f'{prefix}_image_path', image_path)
-                img = Image.open(image_path)
-                setattr(self, f'{prefix}_image', img)  # Store original image
-                
-                # Calculate display size while maintaining aspect ratio - BACK TO WORKING VERSION!
-                canvas_width = canvas.winfo_width() or 400
-                canvas_height = canvas.winfo_height() or 300
-                
-                img_width, img_height = img.size
-                
-                # Scale to fit canvas
-                scale_x = (canvas_width - 20) / img_width
-                scale_y = (canvas_height - 20) / img_height
-                scale = min(scale_x, scale_y)
-                
-                setattr(self, f'{prefix}_scale', scale)  # Store scale for click calculations
-                
-                # Display normally first
-                self.display_image_normal(prefix)
-                
+            future.result()  # Re-raises decode errors
+            image_path = getattr(self, f'{prefix}_image_path')
+            fitted, scale, full_size = self.image_cache.fit(image_path, self.fit_target_size(prefix),
+                                                            self.thumbnail_resample)
+            setattr(self, f'{prefix}_image_size', full_size)  # Original decoded only when zooming
+            setattr(self, f'{prefix}_fit_image', fitted)
+            setattr(self, f'{prefix}_scale', scale)  # Store scale for click calculations
+            if self.plate_strip_var.get():
+                self.show_plate_zoom(prefix)
             else:
-                canvas.create_text(canvas.winfo_width()//2, canvas.winfo_height()//2, 
-                                 text=f"Image not found:\n{filename}", 
-                                 font=('Arial', 12), fill='red')
-                                 
+                self.display_image_normal(prefix)
         except Exception as e:
+            canvas = getattr(self, f'{prefix}_canvas')
+            canvas.delete("all")
             canvas.create_text(canvas.winfo_width()//2, canvas.winfo_height()//2, 
                              text=f"Error loading image:\n{str(e)}", 
                              font=('Arial', 10), fill='red')
-        
         self.update_zoom_info(prefix)
 
+    def get_original_image(self, prefix):
+        """Full resolution image - decoded on first zoom, then served from the cache"""
+        original_image = getattr(self, f'{prefix}_image', None)
+        image_path = getattr(self, f'{prefix}_image_path', None)
+        if original_image is None and image_path:
+            original_image = self.image_cache.original(image_path)
+            setattr(self, f'{prefix}_image', original_image)
+        return original_image
+    
+    @timed('display.draw')
     def display_image_normal(self, prefix):
         """Display image normally - fit to canvas"""
         canvas = getattr(self, f'{prefix}_canvas')
-        original_image = getattr(self, f'{prefix}_image', None)
-        scale = getattr(self, f'{prefix}_scale', 1)
+        img_resized = getattr(self, f'{prefix}_fit_image', None)  # Pre-scaled by the prefetcher
         
-        if not original_image:
+        if img_resized is None:
             return
             
         canvas.delete("all")
@@ -715,12 +932,6 @@ class ANPRValidator:
         canvas_width = canvas.winfo_width() or 400
         canvas_height = canvas.winfo_height() or 300
         
-        # Normal display - fit to canvas
-        img_width, img_height = original_image.size
-        new_width = int(img_width * scale)
-        new_height = int(img_height * scale)
-        
-        img_resized = original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
         photo = ImageTk.PhotoImage(img_resized)
         
         # Store reference
@@ -734,10 +945,17 @@ class ANPRValidator:
     def on_image_click_zoom(self, event, prefix):
         """SIMPLE click to zoom - BACK TO WORKING VERSION!"""
         image_path = getattr(self, f'{prefix}_image_path', None)
-        original_image = getattr(self, f'{prefix}_image', None)
+        image_size = getattr(self, f'{prefix}_image_size', None)
         scale = getattr(self, f'{prefix}_scale', 1)
         
-        if not image_path or not original_image:
+        if not image_path or not image_size:
+            return
+        
+        if getattr(self, f'{prefix}_zoomed', False):
+            if getattr(self, f'{prefix}_viewport', None) is not None:
+                self.zoom_view_at(prefix, 1.5, event.x, event.y)  # Zoom further into the clicked point
+            else:
+                self.reset_zoom_place(prefix)  # Plate view - back to the full frame
             return
             
         canvas = getattr(self, f'{prefix}_canvas')
@@ -747,8 +965,9 @@ class ANPRValidator:
         canvas_height = canvas.winfo_height()
         
         # Get the actual displayed image size
-        displayed_width = int(original_image.width * scale)
-        displayed_height = int(original_image.height * scale)
+        image_width, image_height = image_size
+        displayed_width = int(image_width * scale)
+        displayed_height = int(image_height * scale)
         
         # Calculate the image's position on canvas (centered)
         img_left = (canvas_width - displayed_width) // 2
@@ -768,114 +987,242 @@ class ANPRValidator:
         orig_click_y = int(click_on_img_y / scale)
         
         # Ensure coordinates are within bounds
-        orig_click_x = max(0, min(orig_click_x, original_image.width - 1))
-        orig_click_y = max(0, min(orig_click_y, original_image.height - 1))
+        orig_click_x = max(0, min(orig_click_x, image_width - 1))
+        orig_click_y = max(0, min(orig_click_y, image_height - 1))
+        
+        # Click on the plate - show the precomputed plate crop
+        if self.plate_crops:
+            try:
+                _, (left, top, right, bottom) = self.get_plate_crop(prefix)
+                on_plate = left <= orig_click_x < right and top <= orig_click_y < bottom
+            except (OSError, ValueError):
+                on_plate = False  # No plate crop - zoom the clicked area instead
+            if on_plate:
+                self.show_plate_zoom(prefix)
+                return
         
         # NOW instead of popup - ZOOM IN-PLACE!
         self.zoom_to_area_in_place(prefix, orig_click_x, orig_click_y)
-
-    def zoom_to_area_in_place(self, prefix, center_x, center_y):
-        """Zoom to specific area IN-PLACE - no popup!"""
+    
+    def on_image_right_click(self, event, prefix):
+        """Right click - open the zoom popup around the clicked point"""
+        image_path = getattr(self, f'{prefix}_image_path', None)
+        image_size = getattr(self, f'{prefix}_image_size', None)
+        if not image_path or not image_size:
+            return
+        
+        if getattr(self, f'{prefix}_zoomed', False):
+            center_x, center_y = image_size[0] // 2, image_size[1] // 2
+        else:
+            canvas = getattr(self, f'{prefix}_canvas')
+            scale = getattr(self, f'{prefix}_scale', 1)
+            img_left = (canvas.winfo_width() - int(image_size[0] * scale)) // 2
+            img_top = (canvas.winfo_height() - int(image_size[1] * scale)) // 2
+            center_x = max(0, min(int((event.x - img_left) / scale), image_size[0] - 1))
+            center_y = max(0, min(int((event.y - img_top) / scale), image_size[1] - 1))
+        self.show_zoom_popup(prefix, image_path, center_x, center_y)
+    
+    def get_plate_crop(self, prefix):
+        """Plate crop of the current image, upscaled for the canvas - prefetched when possible"""
+        image_path = getattr(self, f'{prefix}_image_path')
+        box = getattr(self, f'{prefix}_plate_box', None)
+        return self.image_cache.plate(image_path, box, self.fit_target_size(prefix))
+    
+    def show_plate_zoom(self, prefix):
+        """Show the plate region in place of the full frame"""
         canvas = getattr(self, f'{prefix}_canvas')
-        original_image = getattr(self, f'{prefix}_image', None)
+        if not getattr(self, f'{prefix}_image_path', None):
+            return
         
-        if not original_image:
+        try:
+            zoomed_img, (left, top, right, bottom) = self.get_plate_crop(prefix)
+        except (OSError, ValueError) as e:
+            self.status_var.set(f"⚠️ No plate crop for the {prefix} image: {e}")
+            self.display_image_normal(prefix)
             return
-            
-        canvas.delete("all")
+        photo = ImageTk.PhotoImage(zoomed_img)
         
-        # Get canvas size
+        canvas.delete("all")
         canvas_width = canvas.winfo_width() or 400
         canvas_height = canvas.winfo_height() or 300
+        canvas.create_image(canvas_width // 2, canvas_height // 2, image=photo)
         
-        # Crop area around click point (300x300 pixels)
-        crop_size = 300
-        half_crop = crop_size // 2
-        
-        img_width, img_height = original_image.size
-        
-        # Calculate crop boundaries
-        left = max(0, center_x - half_crop)
-        top = max(0, center_y - half_crop) 
-        right = min(img_width, center_x + half_crop)
-        bottom = min(img_height, center_y + half_crop)
+        setattr(self, f'{prefix}_photo', photo)
+        setattr(self, f'{prefix}_zoomed', True)
+        setattr(self, f'{prefix}_viewport', None)
+        setattr(self, f'{prefix}_image_item', None)
+        setattr(self, f'{prefix}_zoom_level', zoomed_img.width / max(1, right - left))
+        self.update_zoom_info(prefix)
+    
+    def toggle_plate_strip(self):
+        """View menu - switch between plate crops only and full frames"""
+        if self.plate_strip_var.get():
+            self.plate_crops = True
+            self.schedule_prefetch()
+        for prefix in ('front', 'rear'):
+            if getattr(self, f'{prefix}_fit_image', None) is None:
+                continue
+            if self.plate_strip_var.get():
+                self.show_plate_zoom(prefix)
+            else:
+                self.reset_zoom_place(prefix)
+
+    @timed('zoom.open')
+    def zoom_to_area_in_place(self, prefix, center_x, center_y):
+        """Zoom to specific area IN-PLACE - no popup!"""
+        original_image = self.get_original_image(prefix)  # Full resolution decode happens here
         
-        # Crop the area
-        cropped_img = original_image.crop((left, top, right, bottom))
+        if not original_image:
+            return
         
-        # Scale up to fit canvas nicely (2x zoom)
-        zoom_factor = 2.0
-        new_width = int(cropped_img.width * zoom_factor)
-        new_height = int(cropped_img.height * zoom_factor)
+        # Same framing as a 300x300 pixel area at 2x - the rest of the canvas shows its surroundings
+        canvas_width, canvas_height = self.view_size(prefix)
+        zoom_factor = min(2.0, (canvas_width - 20) / 300, (canvas_height - 20) / 300)
+        min_zoom = getattr(self, f'{prefix}_scale', 1)  # Never smaller than the fit-to-canvas view
         
-        # Make sure it fits in canvas
-        if new_width > canvas_width - 20:
-            zoom_factor = (canvas_width - 20) / cropped_img.width
-            new_width = int(cropped_img.width * zoom_factor)
-            new_height = int(cropped_img.height * zoom_factor)
-            
-        if new_height > canvas_height - 20:
-            zoom_factor = (canvas_height - 20) / cropped_img.height
-            new_width = int(cropped_img.width * zoom_factor)
-            new_height = int(cropped_img.height * zoom_factor)
+        viewport = ZoomViewport(original_image, zoom_factor, (center_x, center_y), min_zoom=min_zoom)
+        setattr(self, f'{prefix}_viewport', viewport)
+        setattr(self, f'{prefix}_zoomed', True)  # Mark as zoomed
+        getattr(self, f'{prefix}_canvas').delete("all")
+        setattr(self, f'{prefix}_image_item', None)
+        self.render_zoom_view(prefix, viewport, preview=False)
+    
+    def view_size(self, prefix):
+        canvas = getattr(self, f'{prefix}_canvas')
+        return (canvas.winfo_width() or 400, canvas.winfo_height() or 300)
+    
+    @timed('zoom.render')
+    def render_zoom_view(self, prefix, viewport, preview):
+        """Render the visible part of the zoomed image (plus margin) onto the canvas"""
+        setattr(self, f'{prefix}_preview_job' if preview else f'{prefix}_refine_job', None)
+        if getattr(self, f'{prefix}_viewport', None) is not viewport:
+            return  # Reset or another image meanwhile
         
-        # Resize cropped area
-        zoomed_img = cropped_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        photo = ImageTk.PhotoImage(zoomed_img)
+        canvas = getattr(self, f'{prefix}_canvas')
+        resample = Image.Resampling.BILINEAR if preview else Image.Resampling.LANCZOS
+        rendered, position = viewport.render(self.view_size(prefix), resample)
+        photo = ImageTk.PhotoImage(rendered)
+        
+        image_item = getattr(self, f'{prefix}_image_item', None)
+        if image_item is None:
+            image_item = canvas.create_image(*position, image=photo, anchor='nw')
+            setattr(self, f'{prefix}_image_item', image_item)
+        else:
+            canvas.itemconfig(image_item, image=photo)
+            canvas.coords(image_item, *position)
         
         # Store reference
         setattr(self, f'{prefix}_photo', photo)
-        setattr(self, f'{prefix}_zoomed', True)  # Mark as zoomed
-        
-        # Display zoomed image centered
-        x = canvas_width // 2
-        y = canvas_height // 2
-        canvas.create_image(x, y, image=photo)
-        
-        # Update zoom info
-        setattr(self, f'{prefix}_zoom_level', zoom_factor)
+        setattr(self, f'{prefix}_zoom_level', viewport.zoom)
+        self.update_zoom_info(prefix)
+    
+    @timed('zoom.tick')
+    def zoom_view_at(self, prefix, factor, x, y):
+        """Zoom the in-place view by factor around canvas point (x, y)"""
+        viewport = getattr(self, f'{prefix}_viewport')
+        viewport.zoom_at(factor, (x, y), self.view_size(prefix))
+        if factor < 1 and viewport.zoom <= viewport.min_zoom:
+            self.reset_zoom_place(prefix)  # Zoomed all the way out
+            return
+        setattr(self, f'{prefix}_zoom_level', viewport.zoom)
         self.update_zoom_info(prefix)
+        self.update_image_display(prefix)
 
     def reset_zoom_place(self, prefix):
         """Reset to normal view"""
         setattr(self, f'{prefix}_zoom_level', 1.0)
         setattr(self, f'{prefix}_zoomed', False)
+        setattr(self, f'{prefix}_viewport', None)
+        setattr(self, f'{prefix}_image_item', None)
         self.display_image_normal(prefix)
         self.update_zoom_info(prefix)
 
     def zoom_in_place(self, prefix):
-        """Zoom in button - simple"""
-        zoomed = getattr(self, f'{prefix}_zoomed', False)
-        if not zoomed:
+        """Zoom in button - zooms into the middle of the view"""
+        canvas_width, canvas_height = self.view_size(prefix)
+        if getattr(self, f'{prefix}_viewport', None) is not None:
+            self.zoom_view_at(prefix, 1.5, canvas_width / 2, canvas_height / 2)
+        elif not getattr(self, f'{prefix}_zoomed', False):
             # If normal view, just zoom center
-            original_image = getattr(self, f'{prefix}_image', None)
-            if original_image:
-                center_x = original_image.width // 2
-                center_y = original_image.height // 2
+            image_size = getattr(self, f'{prefix}_image_size', None)
+            if image_size:
+                center_x = image_size[0] // 2
+                center_y = image_size[1] // 2
                 self.zoom_to_area_in_place(prefix, center_x, center_y)
 
     def zoom_out_place(self, prefix):
-        """Zoom out = reset to normal"""
-        self.reset_zoom_place(prefix)
+        """Zoom out button - one step out, back to normal once the whole image fits"""
+        if getattr(self, f'{prefix}_viewport', None) is None:
+            self.reset_zoom_place(prefix)
+            return
+        canvas_width, canvas_height = self.view_size(prefix)
+        self.zoom_view_at(prefix, 1 / 1.5, canvas_width / 2, canvas_height / 2)
+    
+    def on_image_press(self, event, prefix):
+        """Button press - a drag pans the zoomed view, a click without movement zooms"""
+        setattr(self, f'{prefix}_drag', {'start': (event.x, event.y), 'last': (event.x, event.y), 'moved': False})
 
+    @timed('zoom.drag')
     def on_image_drag(self, event, prefix):
-        """Simple drag - not needed for now"""
-        pass
+        """Drag - move the rendered image with the mouse, render newly exposed image when idle"""
+        drag = getattr(self, f'{prefix}_drag', None)
+        if drag is None:
+            return
+        if not drag['moved']:
+            start_x, start_y = drag['start']
+            if abs(event.x - start_x) < DRAG_THRESHOLD and abs(event.y - start_y) < DRAG_THRESHOLD:
+                return
+            drag['moved'] = True
+        
+        last_x, last_y = drag['last']
+        drag['last'] = (event.x, event.y)
+        viewport = getattr(self, f'{prefix}_viewport', None)
+        image_item = getattr(self, f'{prefix}_image_item', None)
+        if viewport is None or image_item is None:
+            return
+        
+        # Moving the existing canvas item is all a drag costs while the margin lasts
+        view_size = self.view_size(prefix)
+        viewport.pan(event.x - last_x, event.y - last_y)
+        getattr(self, f'{prefix}_canvas').coords(image_item, *viewport.item_position(view_size))
+        if viewport.needs_render(view_size):
+            self.update_image_display(prefix)
 
     def on_drag_end(self, event, prefix):
-        """Simple drag end - not needed for now"""  
-        pass
+        """Release - a click if the mouse did not move, else refine what the drag rendered fast"""
+        drag = getattr(self, f'{prefix}_drag', None)
+        setattr(self, f'{prefix}_drag', None)
+        if drag is None:
+            return
+        if not drag['moved']:
+            self.on_image_click_zoom(event, prefix)
+            return
+        viewport = getattr(self, f'{prefix}_viewport', None)
+        if viewport is not None and viewport.preview:
+            self.update_image_display(prefix)
 
     def on_mouse_wheel(self, event, prefix):
-        """Mouse wheel - simple zoom in/out"""
-        if event.delta > 0:
+        """Mouse wheel - zoom in/out around the cursor"""
+        if getattr(self, f'{prefix}_viewport', None) is not None:
+            self.zoom_view_at(prefix, 1.25 if event.delta > 0 else 0.8, event.x, event.y)
+        elif event.delta > 0:
             self.zoom_in_place(prefix)
         else:
             self.zoom_out_place(prefix)
 
     def update_image_display(self, prefix):
-        """Not needed - using simpler functions"""
-        pass
+        """Re-render the zoomed view: fast preview when idle, LANCZOS once the drag / wheel stops"""
+        viewport = getattr(self, f'{prefix}_viewport', None)
+        if viewport is None:
+            return
+        if getattr(self, f'{prefix}_preview_job', None) is None and viewport.needs_render(self.view_size(prefix)):
+            setattr(self, f'{prefix}_preview_job',
+                    self.root.after_idle(lambda: self.render_zoom_view(prefix, viewport, preview=True)))
+        refine_job = getattr(self, f'{prefix}_refine_job', None)
+        if refine_job is not None:
+            self.root.after_cancel(refine_job)
+        setattr(self, f'{prefix}_refine_job',
+                self.root.after(POPUP_REFINE_DELAY_MS, lambda: self.render_zoom_view(prefix, viewport, preview=False)))
 
     def update_zoom_info(self, prefix):
         """Update zoom level display"""
@@ -889,18 +1236,21 @@ class ANPRValidator:
                 zoom_info.config(text="Normal View")
 
     def show_zoom_popup(self, prefix, image_path, center_x, center_y):
-        """Show zoomed area around clicked point with original resolution"""
+        """Show zoomed area around clicked point with original resolution
+        
+        The zoom inspector window is built on first use and then only re-targeted
+        to the new crop - opening it again is a bitmap swap, not a new window.
+        """
         if not image_path or not os.path.exists(image_path):
             return
             
         try:
-            # Load original image at FULL RESOLUTION
-            img = Image.open(image_path)
+            # Original image at FULL RESOLUTION - shared with the main view through the cache
+            img = self.image_cache.original(image_path)
             img_width, img_height = img.size
             
             # Define crop area - bigger area for better context
-            crop_size = 300  # pixels - larger area
-            half_crop = crop_size // 2
+            half_crop = POPUP_CROP_SIZE // 2  # pixels - larger area
             
             # Calculate crop boundaries
             left = max(0, center_x - half_crop)
@@ -911,450 +1261,505 @@ class ANPRValidator:
             # Crop the area at ORIGINAL RESOLUTION
             cropped_img = img.crop((left, top, right, bottom))
             
-            # Create popup window - BIGGER for better viewing
-            popup = tk.Toplevel(self.root)
-            popup.title(f"🔍 {prefix.title()} Plate - ORIGINAL RESOLUTION")
-            popup.geometry("900x700")
-            popup.configure(bg='#1a1a1a')
-            popup.resizable(True, True)
-            
-            # Make it always on top for better UX
-            popup.transient(self.root)
-            popup.grab_set()
-            
-            # Create main frame
-            main_frame = tk.Frame(popup, bg='#1a1a1a')
-            main_frame.pack(fill='both', expand=True, padx=5, pady=5)
-            
-            # START WITH ORIGINAL RESOLUTION - NO SCALING!
-            zoom_factor = 1.0  # Keep original resolution
-            display_width = int(cropped_img.width * zoom_factor)
-            display_height = int(cropped_img.height * zoom_factor)
-            
-            # Create the initial image at original resolution
-            zoomed_img = cropped_img.resize((display_width, display_height), Image.Resampling.LANCZOS)
-            photo_popup = ImageTk.PhotoImage(zoomed_img)
-            
-            # Create scrollable canvas with SMOOTH scrolling
-            canvas_frame = tk.Frame(main_frame, bg='#1a1a1a')
-            canvas_frame.pack(fill='both', expand=True)
-            
-            canvas_popup = tk.Canvas(canvas_frame, bg='#1a1a1a', highlightthickness=0, 
-                                   cursor='hand2')  # Hand cursor for dragging
-            
-            # Add SMOOTH scrollbars
-            v_scrollbar = tk.Scrollbar(canvas_frame, orient="vertical", command=canvas_popup.yview, 
-                                     bg='#2c3e50', troughcolor='#1a1a1a')
-            h_scrollbar = tk.Scrollbar(canvas_frame, orient="horizontal", command=canvas_popup.xview,
-                                     bg='#2c3e50', troughcolor='#1a1a1a')
-            canvas_popup.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-            
-            # Pack scrollbars and canvas
-            v_scrollbar.pack(side="right", fill="y")
-            h_scrollbar.pack(side="bottom", fill="x")
-            canvas_popup.pack(side="left", fill="both", expand=True)
-            
-            # Display image at ORIGINAL RESOLUTION - CENTERED
-            image_id = canvas_popup.create_image(0, 0, image=photo_popup, anchor='center')
-            
-            # Set scroll region and CENTER the image
-            canvas_popup.configure(scrollregion=(-display_width//2, -display_height//2, 
-                                                display_width//2, display_height//2))
-            
-            # Keep reference to prevent garbage collection
-            canvas_popup.image = photo_popup
-            
-            # SMOOTH HAND DRAGGING functionality - IMPROVED
-            canvas_popup.drag_data = {"x": 0, "y": 0, "dragging": False}
-            
-            def start_drag(event):
-                canvas_popup.drag_data["x"] = canvas_popup.canvasx(event.x)
-                canvas_popup.drag_data["y"] = canvas_popup.canvasy(event.y)
-                canvas_popup.drag_data["dragging"] = True
-                canvas_popup.configure(cursor='hand1')  # Closed hand while dragging
-            
-            def do_drag(event):
-                if canvas_popup.drag_data["dragging"]:
-                    # Calculate movement delta
-                    new_x = canvas_popup.canvasx(event.x)
-                    new_y = canvas_popup.canvasy(event.y)
-                    
-                    delta_x = new_x - canvas_popup.drag_data["x"]
-                    delta_y = new_y - canvas_popup.drag_data["y"]
-                    
-                    # Move the image smoothly
-                    current_x = canvas_popup.coords(image_id)[0]
-                    current_y = canvas_popup.coords(image_id)[1]
-                    
-                    canvas_popup.coords(image_id, current_x + delta_x, current_y + delta_y)
-                    
-                    # Update drag position
-                    canvas_popup.drag_data["x"] = new_x
-                    canvas_popup.drag_data["y"] = new_y
-            
-            def stop_drag(event):
-                canvas_popup.drag_data["dragging"] = False
-                canvas_popup.configure(cursor='hand2')  # Open hand when not dragging
-            
-            # Bind smooth dragging events
-            canvas_popup.bind("<Button-1>", start_drag)
-            canvas_popup.bind("<B1-Motion>", do_drag)
-            canvas_popup.bind("<ButtonRelease-1>", stop_drag)
-            canvas_popup.bind("<Leave>", stop_drag)  # Stop dragging if mouse leaves
-            
-            # LIGHTNING FAST mouse wheel zoom
-            def fast_mouse_wheel(event):
-                # Super responsive zoom
-                factor = 1.15 if event.delta > 0 else 0.87  # Faster zoom steps
-                self.popup_zoom_fast(popup, canvas_popup, cropped_img, factor, image_id)
-            
-            canvas_popup.bind("<MouseWheel>", fast_mouse_wheel)
-            
-            # Add FAST VALIDATION control frame at TOP
-            validation_control_frame = tk.Frame(popup, bg='#34495e', height=70)
-            validation_control_frame.pack(fill='x', pady=(0, 5))
-            validation_control_frame.pack_propagate(False)
-            
-            # VALIDATION BUTTONS - RIGHT IN THE POPUP!
-            validation_frame = tk.Frame(validation_control_frame, bg='#34495e')
-            validation_frame.pack(side='left', pady=15, padx=20)
-            
-            # Current detected value display
-            current_detected = self.front_detected_var.get() if prefix == 'front' else self.rear_detected_var.get()
-            tk.Label(validation_frame, text=f"🔍 Detected: {current_detected}", 
-                    bg='#34495e', fg='#ecf0f1', font=('Arial', 12, 'bold')).pack(side='left', padx=10)
-            
-            # SUPER FAST VALIDATION BUTTONS
-            correct_btn = tk.Button(validation_frame, text="✅ CORRECT", 
-                                  font=('Arial', 14, 'bold'), bg='#27ae60', fg='white', 
-                                  width=12, height=2, relief='raised', bd=3,
-                                  command=lambda: self.popup_validate_correct(popup, prefix))
-            correct_btn.pack(side='left', padx=10)
-            
-            wrong_btn = tk.Button(validation_frame, text="❌ WRONG", 
-                                font=('Arial', 14, 'bold'), bg='#e74c3c', fg='white', 
-                                width=12, height=2, relief='raised', bd=3,
-                                command=lambda: self.popup_validate_wrong(popup, prefix))
-            wrong_btn.pack(side='left', padx=5)
-            
-            # Quick info
-            info_frame = tk.Frame(validation_control_frame, bg='#34495e')
-            info_frame.pack(side='right', pady=15, padx=20)
-            
-            tk.Label(info_frame, text=f"⚡ FAST VALIDATE: Click buttons above!", 
-                    bg='#34495e', fg='#f39c12', font=('Arial', 10, 'bold')).pack(side='right')
-            control_frame.pack(fill='x', pady=(5, 0))
-            control_frame.pack_propagate(False)
-            
-            # Left side - Zoom controls
-            zoom_frame = tk.Frame(control_frame, bg='#2c3e50')
-            zoom_frame.pack(side='left', pady=15, padx=15)
-            
-            tk.Button(zoom_frame, text="🔍++ ZOOM IN", 
-                     command=lambda: self.popup_zoom_fast(popup, canvas_popup, cropped_img, 1.3, image_id),
-                     bg='#27ae60', fg='white', font=('Arial', 11, 'bold'), 
-                     relief='flat', padx=15).pack(side='left', padx=3)
-            
-            tk.Button(zoom_frame, text="🔍-- ZOOM OUT", 
-                     command=lambda: self.popup_zoom_fast(popup, canvas_popup, cropped_img, 0.77, image_id),
-                     bg='#e74c3c', fg='white', font=('Arial', 11, 'bold'),
-                     relief='flat', padx=15).pack(side='left', padx=3)
-            
-            tk.Button(zoom_frame, text="↺ ORIGINAL SIZE", 
-                     command=lambda: self.popup_zoom_fast(popup, canvas_popup, cropped_img, 'reset', image_id),
-                     bg='#f39c12', fg='white', font=('Arial', 11, 'bold'),
-                     relief='flat', padx=15).pack(side='left', padx=3)
+            popup = self.zoom_popup
+            if popup is None:
+                popup = self.zoom_popup = self.create_zoom_popup()
             
-            # Center - Resolution info
-            info_frame = tk.Frame(control_frame, bg='#2c3e50')
-            info_frame.pack(side='right', pady=15, padx=15)
-            
-            resolution_text = f"📐 Original Resolution: {cropped_img.width}×{cropped_img.height}px"
-            tk.Label(info_frame, text=resolution_text, 
-                    bg='#2c3e50', fg='#ecf0f1', font=('Arial', 10, 'bold')).pack(side='right')
-            
-            tk.Label(info_frame, text="🖱️ Drag to move • Wheel to zoom • ESC to close", 
-                    bg='#2c3e50', fg='#bdc3c7', font=('Arial', 9)).pack(side='right', padx=(0, 20))
-            
-            # Store zoom level and original data
-            popup.zoom_level = 1.0  # Start at original resolution
+            # Re-target: START WITH ORIGINAL RESOLUTION, crop centre in the middle
+            popup.prefix = prefix
+            popup.title(f"🔍 {prefix.title()} Plate - ORIGINAL RESOLUTION")
+            popup.zoom_level = 1.0
+            popup.view_center = (cropped_img.width / 2, cropped_img.height / 2)
             popup.original_crop = cropped_img
-            popup.image_id = image_id
-            
-            # FAST keyboard shortcuts
-            def fast_zoom_in(event):
-                self.popup_zoom_fast(popup, canvas_popup, cropped_img, 1.2, image_id)
-            
-            def fast_zoom_out(event):
-                self.popup_zoom_fast(popup, canvas_popup, cropped_img, 0.83, image_id)
-            
-            def reset_zoom(event):
-                self.popup_zoom_fast(popup, canvas_popup, cropped_img, 'reset', image_id)
-            
-            # Bind FAST keyboard shortcuts
-            popup.bind("<plus>", fast_zoom_in)
-            popup.bind("<equal>", fast_zoom_in)  # = key without shift
-            popup.bind("<minus>", fast_zoom_out)
-            popup.bind("<r>", reset_zoom)
-            popup.bind("<Escape>", lambda e: popup.destroy())
+            current_detected = self.front_detected_var.get() if prefix == 'front' else self.rear_detected_var.get()
+            popup.detected_label.config(text=f"🔍 Detected: {current_detected}")
+            popup.resolution_label.config(text=f"📐 Original Resolution: {cropped_img.width}×{cropped_img.height}px")
+            self.hide_error_options_in_popup(popup)
             
-            # Focus and center the popup
+            # Show it again - modal while open
+            popup.deiconify()
+            popup.lift()
+            popup.grab_set()
             popup.focus_set()
-            popup.update_idletasks()
-            
-            # Center the popup on screen
-            popup.geometry(f"900x700+{(popup.winfo_screenwidth()//2)-450}+{(popup.winfo_screenheight()//2)-350}")
-            
-            # CENTER the image in the canvas view
-            canvas_popup.update_idletasks()
-            canvas_popup.xview_moveto(0.5)
-            canvas_popup.yview_moveto(0.5)
+            self.schedule_popup_render(popup)
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not create zoom popup: {str(e)}")
+    
+    def create_zoom_popup(self):
+        """Build the zoom inspector window once - show_zoom_popup re-targets it, closing only hides it"""
+        # Create popup window - BIGGER for better viewing
+        popup = tk.Toplevel(self.root)
+        popup.withdraw()
+        popup.geometry("900x700")
+        popup.configure(bg='#1a1a1a')
+        popup.resizable(True, True)
+        
+        # Make it always on top for better UX
+        popup.transient(self.root)
+        popup.protocol("WM_DELETE_WINDOW", lambda: self.hide_zoom_popup(popup))
+        
+        # Create main frame
+        main_frame = tk.Frame(popup, bg='#1a1a1a')
+        main_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        popup.main_frame = main_frame
+        
+        # Canvas showing only the visible part of the zoomed crop - see render_popup
+        canvas_popup = tk.Canvas(main_frame, bg='#1a1a1a', highlightthickness=0, 
+                               cursor='hand2')  # Hand cursor for dragging
+        canvas_popup.pack(fill="both", expand=True)
+        image_id = canvas_popup.create_image(0, 0, anchor='nw')
+        
+        # Zoom state - set by show_zoom_popup for every crop
+        popup.prefix = None
+        popup.zoom_level = 1.0
+        popup.view_center = (0, 0)
+        popup.original_crop = None
+        popup.canvas = canvas_popup
+        popup.image_id = image_id
+        popup.preview_job = None
+        popup.refine_job = None
+        
+        # HAND DRAGGING - pans the view; the exposed region is rendered when idle
+        canvas_popup.drag_data = {"x": 0, "y": 0, "dragging": False}
+        
+        def start_drag(event):
+            canvas_popup.drag_data["x"] = event.x
+            canvas_popup.drag_data["y"] = event.y
+            canvas_popup.drag_data["dragging"] = True
+            canvas_popup.configure(cursor='hand1')  # Closed hand while dragging
+        
+        def do_drag(event):
+            if canvas_popup.drag_data["dragging"]:
+                delta_x = event.x - canvas_popup.drag_data["x"]
+                delta_y = event.y - canvas_popup.drag_data["y"]
+                
+                # Move the current bitmap right away, re-render the viewport later
+                canvas_popup.move(image_id, delta_x, delta_y)
+                center_x, center_y = popup.view_center
+                popup.view_center = (center_x - delta_x / popup.zoom_level,
+                                     center_y - delta_y / popup.zoom_level)
+                self.schedule_popup_render(popup)
+                
+                # Update drag position
+                canvas_popup.drag_data["x"] = event.x
+                canvas_popup.drag_data["y"] = event.y
+        
+        def stop_drag(event):
+            canvas_popup.drag_data["dragging"] = False
+            canvas_popup.configure(cursor='hand2')  # Open hand when not dragging
+        
+        # Bind smooth dragging events
+        canvas_popup.bind("<Button-1>", start_drag)
+        canvas_popup.bind("<B1-Motion>", do_drag)
+        canvas_popup.bind("<ButtonRelease-1>", stop_drag)
+        canvas_popup.bind("<Leave>", stop_drag)  # Stop dragging if mouse leaves
+        canvas_popup.bind("<Configure>", lambda e: self.schedule_popup_render(popup))
+        
+        # LIGHTNING FAST mouse wheel zoom
+        def fast_mouse_wheel(event):
+            # Super responsive zoom
+            factor = 1.15 if event.delta > 0 else 0.87  # Faster zoom steps
+            self.popup_zoom_fast(popup, factor)
+        
+        canvas_popup.bind("<MouseWheel>", fast_mouse_wheel)
+        
+        # Add FAST VALIDATION control frame at TOP
+        validation_control_frame = tk.Frame(popup, bg='#34495e', height=70)
+        validation_control_frame.pack(fill='x', pady=(0, 5), before=main_frame)
+        validation_control_frame.pack_propagate(False)
+        popup.validation_frame = validation_control_frame
+        
+        # VALIDATION BUTTONS - RIGHT IN THE POPUP!
+        validation_frame = tk.Frame(validation_control_frame, bg='#34495e')
+        validation_frame.pack(side='left', pady=15, padx=20)
+        
+        # Current detected value display - text set per crop
+        popup.detected_label = tk.Label(validation_frame, bg='#34495e', fg='#ecf0f1', font=('Arial', 12, 'bold'))
+        popup.detected_label.pack(side='left', padx=10)
+        
+        # SUPER FAST VALIDATION BUTTONS
+        correct_btn = tk.Button(validation_frame, text="✅ CORRECT", 
+                              font=('Arial', 14, 'bold'), bg='#27ae60', fg='white', 
+                              width=12, height=2, relief='raised', bd=3,
+                              command=lambda: self.popup_validate_correct(popup, popup.prefix))
+        correct_btn.pack(side='left', padx=10)
+        
+        wrong_btn = tk.Button(validation_frame, text="❌ WRONG", 
+                            font=('Arial', 14, 'bold'), bg='#e74c3c', fg='white', 
+                            width=12, height=2, relief='raised', bd=3,
+                            command=lambda: self.popup_validate_wrong(popup, popup.prefix))
+        wrong_btn.pack(side='left', padx=5)
+        
+        # Quick info
+        info_frame = tk.Frame(validation_control_frame, bg='#34495e')
+        info_frame.pack(side='right', pady=15, padx=20)
+        
+        tk.Label(info_frame, text=f"⚡ FAST VALIDATE: Click buttons above!", 
+                bg='#34495e', fg='#f39c12', font=('Arial', 10, 'bold')).pack(side='right')
+        
+        # Error selection frame - swapped in for the validation buttons, see show_error_options_in_popup
+        error_frame = tk.Frame(popup, bg='#e74c3c', height=120)
+        error_frame.pack_propagate(False)
+        popup.error_frame = error_frame
+        
+        popup.error_title = tk.Label(error_frame, font=('Arial', 14, 'bold'), bg='#e74c3c', fg='white')
+        popup.error_title.pack(pady=(10, 5))
+        
+        # Error options in 2 rows
+        for row_options in (ERROR_OPTIONS[:4], ERROR_OPTIONS[4:]):
+            row_frame = tk.Frame(error_frame, bg='#e74c3c')
+            row_frame.pack(pady=2)
+            for display_name, error_code in row_options:
+                tk.Button(row_frame, text=display_name, font=('Arial', 9, 'bold'),
+                          bg='#c0392b', fg='white', width=15, height=1,
+                          command=lambda code=error_code: self.popup_select_error(popup, popup.prefix, code)
+                          ).pack(side='left', padx=3)
+        
+        # Cancel button
+        cancel_btn = tk.Button(row_frame, text="↩️ BACK", font=('Arial', 9, 'bold'),
+                              bg='#95a5a6', fg='white', width=15, height=1,
+                              command=lambda: self.hide_error_options_in_popup(popup))
+        cancel_btn.pack(side='left', padx=3)
+        
+        # Zoom control frame at the bottom
+        control_frame = tk.Frame(popup, bg='#2c3e50', height=60)
+        control_frame.pack(fill='x', pady=(5, 0))
+        control_frame.pack_propagate(False)
+        
+        # Left side - Zoom controls
+        zoom_frame = tk.Frame(control_frame, bg='#2c3e50')
+        zoom_frame.pack(side='left', pady=15, padx=15)
+        
+        tk.Button(zoom_frame, text="🔍++ ZOOM IN", 
+                 command=lambda: self.popup_zoom_fast(popup, 1.3),
+                 bg='#27ae60', fg='white', font=('Arial', 11, 'bold'), 
+                 relief='flat', padx=15).pack(side='left', padx=3)
+        
+        tk.Button(zoom_frame, text="🔍-- ZOOM OUT", 
+                 command=lambda: self.popup_zoom_fast(popup, 0.77),
+                 bg='#e74c3c', fg='white', font=('Arial', 11, 'bold'),
+                 relief='flat', padx=15).pack(side='left', padx=3)
+        
+        tk.Button(zoom_frame, text="↺ ORIGINAL SIZE", 
+                 command=lambda: self.popup_zoom_fast(popup, 'reset'),
+                 bg='#f39c12', fg='white', font=('Arial', 11, 'bold'),
+                 relief='flat', padx=15).pack(side='left', padx=3)
+        
+        # Center - Resolution info - text set per crop
+        info_frame = tk.Frame(control_frame, bg='#2c3e50')
+        info_frame.pack(side='right', pady=15, padx=15)
+        
+        popup.resolution_label = tk.Label(info_frame, bg='#2c3e50', fg='#ecf0f1', font=('Arial', 10, 'bold'))
+        popup.resolution_label.pack(side='right')
+        
+        tk.Label(info_frame, text="🖱️ Drag to move • Wheel to zoom • ESC to close", 
+                bg='#2c3e50', fg='#bdc3c7', font=('Arial', 9)).pack(side='right', padx=(0, 20))
+        
+        # Bind FAST keyboard shortcuts
+        popup.bind("<plus>", lambda e: self.popup_zoom_fast(popup, 1.2))
+        popup.bind("<equal>", lambda e: self.popup_zoom_fast(popup, 1.2))  # = key without shift
+        popup.bind("<minus>", lambda e: self.popup_zoom_fast(popup, 0.83))
+        popup.bind("<r>", lambda e: self.popup_zoom_fast(popup, 'reset'))
+        popup.bind("<Escape>", lambda e: self.hide_zoom_popup(popup))
+        
+        # Center the popup on screen - it keeps its place and size after that
+        popup.geometry(f"900x700+{(popup.winfo_screenwidth()//2)-450}+{(popup.winfo_screenheight()//2)-350}")
+        return popup
+    
+    def hide_zoom_popup(self, popup):
+        """Close the zoom inspector - it is only hidden, ready for the next crop"""
+        for job in ('preview_job', 'refine_job'):
+            if getattr(popup, job) is not None:
+                popup.after_cancel(getattr(popup, job))
+                setattr(popup, job, None)
+        popup.grab_release()
+        popup.withdraw()
 
-    def popup_zoom_fast(self, popup, canvas, original_crop, factor, image_id):
-        """LIGHTNING FAST zoom with original resolution preserved"""
+    def popup_zoom_fast(self, popup, factor):
+        """LIGHTNING FAST zoom with original resolution preserved
+        
+        Only the zoom level changes here; rendering is coalesced, so a burst of
+        wheel ticks costs one fast preview and one LANCZOS refine.
+        """
+        if factor == 'reset':
+            popup.zoom_level = 1.0  # Back to original resolution
+            popup.view_center = (popup.original_crop.width / 2, popup.original_crop.height / 2)
+        else:
+            popup.zoom_level *= factor
+            popup.zoom_level = max(0.3, min(8.0, popup.zoom_level))  # Wider zoom range
+        self.schedule_popup_render(popup)
+    
+    def schedule_popup_render(self, popup):
+        """Fast preview once pending events are handled, LANCZOS once the wheel / drag goes idle"""
+        if popup.preview_job is None:
+            popup.preview_job = popup.after_idle(lambda: self.render_popup(popup, preview=True))
+        if popup.refine_job is not None:
+            popup.after_cancel(popup.refine_job)
+        popup.refine_job = popup.after(POPUP_REFINE_DELAY_MS, lambda: self.render_popup(popup, preview=False))
+    
+    @timed('popup.render')
+    def render_popup(self, popup, preview):
+        """Render the visible part of the zoomed crop into the popup canvas"""
+        if preview:
+            popup.preview_job = None
+        else:
+            popup.refine_job = None
+        if popup.original_crop is None:
+            return  # Built but not targeted at a crop yet
         try:
-            if factor == 'reset':
-                popup.zoom_level = 1.0  # Back to original resolution
-            else:
-                popup.zoom_level *= factor
-                popup.zoom_level = max(0.3, min(8.0, popup.zoom_level))  # Wider zoom range
-            
-            # Calculate new size - KEEP CRISP RESOLUTION
-            new_width = int(original_crop.width * popup.zoom_level)
-            new_height = int(original_crop.height * popup.zoom_level)
-            
-            # Use LANCZOS for crisp scaling
-            zoomed_img = original_crop.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(zoomed_img)
-            
-            # Get current image position
-            current_x, current_y = canvas.coords(image_id)
-            
-            # Update image INSTANTLY with new photo
-            canvas.itemconfig(image_id, image=photo)
+            canvas = popup.canvas
+            viewport = (max(1, canvas.winfo_width()), max(1, canvas.winfo_height()))
+            resample = Image.Resampling.BILINEAR if preview else Image.Resampling.LANCZOS
+            rendered, offset, popup.view_center = render_viewport(popup.original_crop, popup.zoom_level,
+                                                                  popup.view_center, viewport, resample)
+            photo = ImageTk.PhotoImage(rendered)
+            canvas.itemconfig(popup.image_id, image=photo)
+            canvas.coords(popup.image_id, *offset)
             canvas.image = photo  # Keep reference
-            
-            # Update scroll region to accommodate new size
-            canvas.configure(scrollregion=(-new_width//2, -new_height//2, 
-                                         new_width//2, new_height//2))
-            
-            # If resetting, center the image
-            if factor == 'reset':
-                canvas.coords(image_id, 0, 0)  # Center position
-                canvas.xview_moveto(0.5)
-                canvas.yview_moveto(0.5)
-            else:
-                # Keep current position during zoom
-                canvas.coords(image_id, current_x, current_y)
-                
-        except Exception as e:
-            print(f"Zoom error: {e}")  # Silent error handling for smooth UX
+        except tk.TclError:
+            pass  # Popup closed before an idle render ran
     
     def popup_validate_correct(self, popup, prefix):
         """Handle CORRECT validation from popup window"""
         # Close popup immediately
-        popup.destroy()
+        self.hide_zoom_popup(popup)
         
         # Mark as correct (same as clicking correct in main window)
-        key = f"{self.current_index}_{prefix}"
-        self.validation_results[key] = True
-        
-        # Add to CSV
         self.add_validated_record(prefix, "correct")
         
         # Visual feedback
-        total_validated = len(self.validation_df)
+        total_validated = len(self.engine.store)
         self.status_var.set(f"✅ {prefix.upper()} CORRECT (from zoom) | Total: {total_validated}")
         self.update_validation_stats()
         
         # Check for auto-advance
-        front_key = f"{self.current_index}_front"
-        rear_key = f"{self.current_index}_rear"
-        
-        if front_key in self.validation_results and rear_key in self.validation_results:
-            self.root.after(300, self.next_record)
+        if self.engine.is_complete(self.current_index):
+            self.advance_when_ready()
     
     def popup_validate_wrong(self, popup, prefix):
         """Handle WRONG validation from popup window"""
+        self.show_error_options_in_popup(popup, prefix)
+    
     def show_error_options_in_popup(self, zoom_popup, prefix):
-        """Show error options RIGHT IN the zoom popup - no new window!"""
-        # Find the validation control frame and hide it temporarily
-        for widget in zoom_popup.winfo_children():
-            if isinstance(widget, tk.Frame) and widget.cget('bg') == '#34495e':
-                widget.pack_forget()
-                break
-        
-        # Create error selection frame
-        error_frame = tk.Frame(zoom_popup, bg='#e74c3c', height=120)
-        error_frame.pack(fill='x', pady=(0, 5), before=zoom_popup.winfo_children()[0])
-        error_frame.pack_propagate(False)
-        
-        # Title
-        title_label = tk.Label(error_frame, text=f"❌ SELECT ERROR TYPE FOR {prefix.upper()} PLATE", 
-                              font=('Arial', 14, 'bold'), bg='#e74c3c', fg='white')
-        title_label.pack(pady=(10, 5))
-        
-        # Error options in 2 rows
-        error_options = [
-            ("🚫 Hidden/Broken", "hidden_broken"),
-            ("❌ Fail", "fail"),
-            ("🚗 No License Plate", "no_LP"),
-            ("🚙 No Vehicle", "no_vehicle"),
-            ("🌫️ Blur", "blur"),
-            ("🏍️ Motorcycle", "moto"),
-            ("🔄 Wrong Pair", "wrong_pair")
-        ]
-        
-        # First row
-        row1_frame = tk.Frame(error_frame, bg='#e74c3c')
-        row1_frame.pack(pady=2)
-        
-        for i, (display_name, error_code) in enumerate(error_options[:4]):
-            btn = tk.Button(row1_frame, text=display_name, font=('Arial', 9, 'bold'),
-                           bg='#c0392b', fg='white', width=15, height=1,
-                           command=lambda code=error_code: self.popup_select_error(zoom_popup, prefix, code))
-            btn.pack(side='left', padx=3)
-        
-        # Second row
-        row2_frame = tk.Frame(error_frame, bg='#e74c3c')
-        row2_frame.pack(pady=2)
-        
-        for i, (display_name, error_code) in enumerate(error_options[4:]):
-            btn = tk.Button(row2_frame, text=display_name, font=('Arial', 9, 'bold'),
-                           bg='#c0392b', fg='white', width=15, height=1,
-                           command=lambda code=error_code: self.popup_select_error(zoom_popup, prefix, code))
-            btn.pack(side='left', padx=3)
-        
-        # Cancel button
-        cancel_btn = tk.Button(row2_frame, text="↩️ BACK", font=('Arial', 9, 'bold'),
-                              bg='#95a5a6', fg='white', width=15, height=1,
-                              command=lambda: self.hide_error_options_in_popup(zoom_popup, error_frame))
-        cancel_btn.pack(side='left', padx=3)
-        
-        # Store reference for hiding later
-        zoom_popup.error_frame = error_frame
+        """Show error options RIGHT IN the zoom popup - no new window, the buttons are built once"""
+        zoom_popup.error_title.config(text=f"❌ SELECT ERROR TYPE FOR {prefix.upper()} PLATE")
+        zoom_popup.validation_frame.pack_forget()
+        zoom_popup.error_frame.pack(fill='x', pady=(0, 5), before=zoom_popup.main_frame)
     
-    def hide_error_options_in_popup(self, zoom_popup, error_frame):
+    def hide_error_options_in_popup(self, zoom_popup):
         """Hide error options and show validation buttons again"""
-        error_frame.destroy()
-        
-        # Show validation frame again
-        for widget in zoom_popup.winfo_children():
-            if isinstance(widget, tk.Frame) and widget.cget('bg') == '#34495e':
-                widget.pack(fill='x', pady=(0, 5), before=zoom_popup.winfo_children()[0])
-                break
+        zoom_popup.error_frame.pack_forget()
+        zoom_popup.validation_frame.pack(fill='x', pady=(0, 5), before=zoom_popup.main_frame)
     
     def popup_select_error(self, zoom_popup, prefix, error_code):
         """Handle error selection from popup"""
         # Close the popup
-        zoom_popup.destroy()
+        self.hide_zoom_popup(zoom_popup)
         
-        # Mark as incorrect
-        key = f"{self.current_index}_{prefix}"
-        self.validation_results[key] = False
-        
-        # Add to CSV with error code
+        # Mark as incorrect - add to CSV with error code
         self.add_validated_record(prefix, error_code)
         
         # Visual feedback
         error_display = error_code.replace('_', ' ').title()
-        total_validated = len(self.validation_df)
+        total_validated = len(self.engine.store)
         self.status_var.set(f"❌ {error_display} (from zoom) | Total: {total_validated}")
         self.update_validation_stats()
         
         # Check for auto-advance
-        front_key = f"{self.current_index}_front"
-        rear_key = f"{self.current_index}_rear"
-        
-        if front_key in self.validation_results and rear_key in self.validation_results:
-            self.root.after(300, self.next_record)
+        if self.engine.is_complete(self.current_index):
+            self.advance_when_ready()
         
     def previous_record(self):
-        """Navigate to previous record"""
-        if self.current_index > 0:
-            self.current_index -= 1
-            self.update_navigation()
-            self.update_display()
+        """Navigate to previous record (in the review queue, skipping broken media if selected)"""
+        if self.engine.df is None:
+            return
+        index = self.engine.next_index(self.current_index, -1, self.skip_broken_var.get(), self.review_queue)
+        if index is not None:
+            self.go_to_record(index)
             
     def next_record(self):
-        """Navigate to next record"""
-        if self.df is not None and self.current_index < len(self.df) - 1:
-            self.current_index += 1
-            self.update_navigation()
-            self.update_display()
-            
-    def mark_validation(self, prefix, is_correct):
-        """Mark validation result for current record"""
-        key = f"{self.current_index}_{prefix}"
-        self.validation_results[key] = is_correct
+        """Navigate to next record (in the review queue, skipping broken media if selected)"""
+        if self.engine.df is None:
+            return
+        index = self.engine.next_index(self.current_index, 1, self.skip_broken_var.get(), self.review_queue)
+        if index is not None:
+            self.go_to_record(index)
+    
+    def go_to_record(self, index):
+        """Show record index"""
+        self.advancing = None
+        self.current_index = index
+        self.update_navigation()
+        self.update_display()
+    
+    def build_review_queue(self):
+        """(Re)build the review queue from the verdicts and the filter - False on a bad filter"""
+        filter_text = self.review_filter_var.get().strip()
+        if not self.review_pending_var.get() and not filter_text:
+            self.review_queue = None
+            return True
+        try:
+            self.review_queue = self.engine.review_queue(filter_text, self.review_pending_var.get())
+        except ValueError as e:
+            self.review_queue = None
+            messagebox.showerror("Error", str(e))
+            return False
+        return True
+    
+    def apply_review_filter(self):
+        """Review queue settings changed - rebuild it and move to its first record from here on"""
+        if self.engine.df is None or self.loading is not None:
+            return  # Built once loading finishes
+        if not self.build_review_queue():
+            return
+        if self.review_queue is None:
+            self.status_var.set("Review queue off - visiting every record")
+            return
+        if not len(self.review_queue):
+            self.status_var.set("⚠️ No records match the review filter")
+            return
         
-        if is_correct:
-            # CORRECT - Add/Update record in CSV with "correct"
-            self.add_validated_record(prefix, "correct")
-            
-            # Visual feedback in status bar - NO POPUP!
-            total_validated = len(self.validation_df)
-            self.status_var.set(f"✅ {prefix.upper()} CORRECT | Total validated: {total_validated}")
-            self.update_validation_stats()
-            
-        else:
-            # WRONG - Show error selection popup
-            self.show_error_options(prefix)
-            return  # Don't auto-advance yet, wait for error selection
+        index = self.engine.next_index(self.current_index - 1, 1, self.skip_broken_var.get(), self.review_queue)
+        if index is None:
+            index = self.engine.next_index(-1, 1, self.skip_broken_var.get(), self.review_queue)
+        if index is not None:
+            self.go_to_record(index)
+        self.status_var.set(f"Review queue: {len(self.review_queue)} records"
+                            + (f" matching '{self.review_queue.filter_text}'" if self.review_queue.filter_text else ""))
+    
+    def record_image_futures(self, index):
+        """Prefetcher futures of record index's front and rear images"""
+        futures = []
+        row = self.engine.df.iloc[index]
+        for prefix, column in (('front', 'fr_mediaid'), ('rear', 're_mediaid')):
+            mediaid = row.get(column)
+            if not mediaid or pd.isna(mediaid) or not self.engine.image_folder:
+                continue
+            path = self.engine.resolve_image_path(mediaid)
+            if path:
+                futures.append(self.prefetcher.submit(path, self.fit_target_size(prefix)))
+        return futures
+    
+    def advance_when_ready(self, instant=False):
+        """Auto-advance to the next record that still needs a verdict, as soon as its images are decoded
+        
+        instant (rapid mode) moves on right away - images not decoded yet show "Loading..." until they are.
+        """
+        pending = self.review_queue is not None
+        index = self.engine.next_index(self.current_index, 1, self.skip_broken_var.get(), self.review_queue, pending)
+        if index is None:
+            if pending:
+                self.status_var.set("🎉 Review queue finished - no more records to validate")
+            return
         
-        # Check if both plates are validated for auto-advance
-        front_key = f"{self.current_index}_front"
-        rear_key = f"{self.current_index}_rear"
+        if instant:
+            self.go_to_record(index)
+            return
         
-        if front_key in self.validation_results and rear_key in self.validation_results:
-            self.root.after(300, self.next_record)  # LIGHTNING FAST auto-advance!
-            
-    def previous_record(self):
-        """Navigate to previous record"""
-        if self.current_index > 0:
-            self.current_index -= 1
-            self.update_navigation()
-            self.update_display()
-            
-    def next_record(self):
-        """Navigate to next record"""
-        if self.df is not None and self.current_index < len(self.df) - 1:
-            self.current_index += 1
-            self.update_navigation()
-            self.update_display()
+        token = object()
+        self.advancing = token
+        deadline = time.monotonic() + AUTO_ADVANCE_MAX_WAIT_MS / 1000
+        self.poll_auto_advance(token, index, self.record_image_futures(index), deadline)
+    
+    def poll_auto_advance(self, token, index, futures, deadline):
+        """Wait (without blocking Tk) for the images advance_when_ready is waiting on"""
+        if self.advancing is not token:
+            return  # User navigated meanwhile
+        if all(future.done() for future in futures) or time.monotonic() >= deadline:
+            self.go_to_record(index)
+        else:
+            self.root.after(15, lambda: self.poll_auto_advance(token, index, futures, deadline))
             
     def mark_validation(self, prefix, is_correct):
         """Mark validation result for current record"""
-        key = f"{self.current_index}_{prefix}"
-        self.validation_results[key] = is_correct
-        
         if is_correct:
             # CORRECT - Add/Update record in CSV with "correct"
             self.add_validated_record(prefix, "correct")
             
             # Visual feedback in status bar - NO POPUP!
-            total_validated = len(self.validation_df)
+            total_validated = len(self.engine.store)
             self.status_var.set(f"✅ {prefix.upper()} CORRECT | Total validated: {total_validated}")
             self.update_validation_stats()
             
+        elif self.rapid_var.get():
+            # WRONG in rapid mode - no popup, the error bar / keys 1-8 pick the code
+            self.set_rapid_side(prefix)
+            self.status_var.set(f"❌ {prefix.upper()} WRONG - press 1-8 or click the error type")
+            return
+        
         else:
             # WRONG - Show error selection popup
             self.show_error_options(prefix)
             return  # Don't auto-advance yet, wait for error selection
         
         # Check if both plates are validated for auto-advance
-        front_key = f"{self.current_index}_front"
-        rear_key = f"{self.current_index}_rear"
-        
-        if front_key in self.validation_results and rear_key in self.validation_results:
-            self.root.after(300, self.next_record)  # LIGHTNING FAST auto-advance!
-            
+        if self.engine.is_complete(self.current_index):
+            self.advance_when_ready()
+            
+    def toggle_rapid_mode(self):
+        """View menu - show / hide the rapid error bars and the active side highlight"""
+        rapid = self.rapid_var.get()
+        for prefix in ('front', 'rear'):
+            rapid_frame = getattr(self, f'{prefix}_rapid_frame')
+            if rapid:
+                rapid_frame.pack(fill='x', padx=10, before=getattr(self, f'{prefix}_img_frame'))
+            else:
+                rapid_frame.pack_forget()
+        if rapid:
+            self.set_rapid_side(self.rapid_side)
+            self.status_var.set("⚡ Rapid mode: C correct | 1-8 error type | Space both correct | "
+                                "F / R / Tab pick side")
+        else:
+            for prefix in ('front', 'rear'):
+                getattr(self, f'{prefix}_panel').config(fg='black')
+            self.status_var.set("Rapid mode off")
+    
+    def set_rapid_side(self, prefix):
+        """Make prefix the side rapid keys give verdicts to - highlighted panel title"""
+        self.rapid_side = prefix
+        for side in ('front', 'rear'):
+            getattr(self, f'{side}_panel').config(fg='#e67e22' if side == prefix else 'black')
+    
+    def on_rapid_key(self, event):
+        """Rapid mode key press anywhere in the main window (text fields keep their keys)"""
+        if not self.rapid_var.get() or self.engine.df is None or self.loading is not None:
+            return None
+        if isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return None
+        key = event.keysym.replace('KP_', '').lower()
+        if key in RAPID_KEYS:
+            self.rapid_verdict(self.rapid_side, RAPID_KEYS[key])
+        elif key == 'space':
+            self.rapid_verdict('front', 'correct', advance=False)
+            self.rapid_verdict('rear', 'correct')
+        elif key in ('f', 'r'):
+            self.set_rapid_side('front' if key == 'f' else 'rear')
+        elif key in ('tab', 'iso_left_tab'):
+            self.set_rapid_side('rear' if self.rapid_side == 'front' else 'front')
+        else:
+            return None
+        return "break"  # No focus traversal / button activation
+    
+    def rapid_verdict(self, prefix, value, advance=True):
+        """Record a verdict without any popup; move to the other side, or on to the next record"""
+        if self.engine.store is None or self.engine.df is None:
+            return
+        self.add_validated_record(prefix, value)
+        self.update_validation_stats()
+        mark = "✅" if value == 'correct' else "❌"
+        self.status_var.set(f"{mark} {prefix.upper()} {value.replace('_', ' ')} | "
+                            f"Total validated: {len(self.engine.store)}")
+        
+        if self.engine.is_complete(self.current_index):
+            if advance:
+                self.advance_when_ready(instant=True)
+        elif not self.engine.verdicts.get(self.current_index, 'rear' if prefix == 'front' else 'front'):
+            self.set_rapid_side('rear' if prefix == 'front' else 'front')
+    
     def export_results(self):
         """Export validation results to JSON file (legacy format)"""
-        if not self.validation_results:
+        if self.engine.verdicts is None or not any(self.engine.verdicts.validated.values()):
             messagebox.showwarning("Warning", "No validation results to export")
             return
             
@@ -1367,26 +1772,129 @@ class ANPRValidator:
         if filename:
             try:
                 with open(filename, 'w') as f:
-                    json.dump(self.validation_results, f, indent=2)
+                    json.dump(self.engine.verdicts.legacy_results(), f, indent=2)
                 messagebox.showinfo("Success", f"Results exported to {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export results: {str(e)}")
     
+    def export_summary_report(self):
+        """Export accuracy, error code and plate agreement summary (CSV or JSON)"""
+        if self.engine.verdicts is None or not any(self.engine.verdicts.validated.values()):
+            messagebox.showwarning("Warning", "No validation results to report")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            title="Save summary report",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        
+        if filename:
+            try:
+                population = self.engine.sampler.population if self.engine.sampler is not None else None
+                write_report(build_report(self.engine.df, self.engine.verdicts, population), filename)
+                messagebox.showinfo("Success", f"Summary report exported to {filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export summary report: {str(e)}")
+    
+    def set_output_format(self):
+        """Output format menu - write the results in the new format from now on"""
+        self.engine.set_output_format(self.output_format_var.get())
+        if self.engine.resumed:
+            try:
+                self.engine.compact()
+                self.status_var.set(f"Validation results now saved to {self.engine.output_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save validation results: {str(e)}")
+    
+    def sync_journal(self):
+        """Periodic fsync so an idle reviewer's last batch reaches the disk too"""
+        if self.engine.journal is not None:
+            try:
+                self.engine.sync()
+            except OSError as e:
+                self.status_var.set(f"⚠️ Failed to sync validation journal: {str(e)}")
+        self.root.after(2000, self.sync_journal)
+    
     def save_current_validation(self):
         """Force save current validation CSV"""
-        if self.validation_df is not None:
+        if self.engine.store is not None:
             try:
-                self.validation_df.to_csv(self.csv_output_path, index=False)
-                messagebox.showinfo("✅ Saved", f"Validation results saved to:\n{self.csv_output_path}")
+                self.engine.compact()
+                messagebox.showinfo("✅ Saved", f"Validation results saved to:\n{self.engine.output_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save validation CSV: {str(e)}")
         else:
             messagebox.showwarning("Warning", "No validation data to save. Please load a CSV first.")
+    
+    def on_exit(self):
+        """Compact the journal into the validation CSV, dump the session's timings and quit"""
+        if self.engine.store is not None:
+            try:
+                self.engine.close()
+            except Exception as e:
+                if not messagebox.askyesno("Error", f"Failed to save validation CSV: {str(e)}\n\n"
+                                           f"Your verdicts are kept in the journal.\nExit anyway?"):
+                    return
+        if self.metrics.enabled:
+            base = self.engine.session_base or "anpr_validator"
+            try:
+                self.metrics.dump(f"{base}_METRICS_{time.strftime('%Y%m%d-%H%M%S')}.json")
+            except OSError:
+                pass  # Timings are a diagnostic - never block exiting
+        self.root.quit()
+
+def parse_args(argv=None):
+    """Command line options for the GUI"""
+    parser = argparse.ArgumentParser(description="ANPR Detection Validator Pro")
+    parser.add_argument('--prefetch', type=int, default=3, metavar='N',
+                        help="number of upcoming records to decode in the background (default: 3)")
+    parser.add_argument('--prefetch-behind', type=int, default=1, metavar='N',
+                        help="number of previous records to keep decoded (default: 1)")
+    parser.add_argument('--prefetch-workers', type=int, default=2, metavar='N',
+                        help="decoder threads (default: 2)")
+    parser.add_argument('--cache-mb', type=int, default=1024, metavar='MB',
+                        help="memory budget for decoded images (default: 1024)")
+    parser.add_argument('--output-format', choices=sorted(OUTPUT_FORMATS), default='csv',
+                        help="format of the _VALIDATED results file (default: csv)")
+    parser.add_argument('--prescan', choices=('off',) + MEDIA_CHECKS, default='header',
+                        help="check all images after loading: exists, header (default) or decode")
+    parser.add_argument('--prescan-workers', type=int, default=None, metavar='N',
+                        help="processes for the image check (default: one per CPU)")
+    parser.add_argument('--plate-crops', action='store_true',
+                        help="precompute plate crops so clicking the plate zooms instantly")
+    parser.add_argument('--plate-strip', action='store_true',
+                        help="start in plate strip view: show only the plate crops (implies --plate-crops)")
+    parser.add_argument('--thumbnail-filter', choices=sorted(RESAMPLE_FILTERS), default='lanczos',
+                        help="resampling filter for fit-to-canvas images - bilinear is faster (default: lanczos)")
+    parser.add_argument('--shard', metavar='K/N',
+                        help="review only the K-th of N shards of each CSV (merge the outputs with anpr_core.py merge)")
+    parser.add_argument('--shard-method', choices=SHARD_METHODS, default='hash',
+                        help="hash: spread vdata_ids evenly (default), range: contiguous vdata_id ranges")
+    parser.add_argument('--rapid', action='store_true',
+                        help="start in rapid mode: single keys give verdicts, no popups, instant advance")
+    parser.add_argument('--metrics', action='store_true',
+                        help="time the hot paths: p50/p95 in the status bar, <name>_METRICS_<time>.json on exit")
+    add_sample_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        if args.shard:
+            args.shard = (*parse_shard(args.shard), args.shard_method)
+        args.sample = sample_options(args)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
 
 def main():
     """Main application entry point"""
+    args = parse_args()
     root = tk.Tk()
-    app = ANPRValidator(root)
+    app = ANPRValidator(root, prefetch_ahead=args.prefetch, prefetch_behind=args.prefetch_behind,
+                        prefetch_workers=args.prefetch_workers, cache_mb=args.cache_mb,
+                        thumbnail_filter=args.thumbnail_filter, output_format=args.output_format,
+                        prescan=args.prescan, prescan_workers=args.prescan_workers,
+                        plate_crops=args.plate_crops, plate_strip=args.plate_strip, shard=args.shard,
+                        sample=args.sample, metrics=args.metrics, rapid=args.rapid)
     
     # Add menu bar
     menubar = tk.Menu(root)
@@ -1395,11 +1903,29 @@ def main():
     file_menu = tk.Menu(menubar, tearoff=0)
     menubar.add_cascade(label="File", menu=file_menu)
     file_menu.add_command(label="Load CSV", command=app.load_csv)
+    file_menu.add_command(label="Load CSV Sample...", command=app.load_csv_sample)
     file_menu.add_command(label="Save Validation Results", command=lambda: app.save_current_validation())
+    file_menu.add_command(label="Scan Images (decode)", command=lambda: app.start_media_scan('decode'))
+    
+    format_menu = tk.Menu(file_menu, tearoff=0)
+    file_menu.add_cascade(label="Output Format", menu=format_menu)
+    for output_format in OUTPUT_FORMATS:
+        format_menu.add_radiobutton(label=output_format.title(), value=output_format,
+                                    variable=app.output_format_var, command=app.set_output_format)
     file_menu.add_separator()
     file_menu.add_command(label="Export Old Format", command=app.export_results)
+    file_menu.add_command(label="Export Summary Report", command=app.export_summary_report)
     file_menu.add_separator()
-    file_menu.add_command(label="Exit", command=root.quit)
+    file_menu.add_command(label="Exit", command=app.on_exit)
+    
+    view_menu = tk.Menu(menubar, tearoff=0)
+    menubar.add_cascade(label="View", menu=view_menu)
+    view_menu.add_checkbutton(label="Plate Strip (plate crops only)", variable=app.plate_strip_var,
+                              command=app.toggle_plate_strip)
+    view_menu.add_checkbutton(label="Rapid Keyboard Mode (no popups)", variable=app.rapid_var,
+                              command=app.toggle_rapid_mode)
+    view_menu.add_separator()
+    view_menu.add_command(label="Session Summary", command=app.show_session_summary)
     
     help_menu = tk.Menu(menubar, tearoff=0)
     menubar.add_cascade(label="Help", menu=help_menu)
@@ -1419,9 +1945,14 @@ def main():
     root.bind('<Left>', lambda e: app.previous_record())
     root.bind('<Right>', lambda e: app.next_record())
     root.bind('<Escape>', lambda e: root.focus_set())  # Clear focus from popups
+    root.bind('<Key>', app.on_rapid_key)  # Rapid mode verdict keys
+    
+    root.protocol("WM_DELETE_WINDOW", app.on_exit)
+    app.sync_journal()
     
     # Start the application
     root.mainloop()
+    app.prefetcher.shutdown()
 
 if __name__ == "__main__":
     main()